@@ -2,17 +2,26 @@
 
 from __future__ import annotations
 
+import functools
+import gzip
 import os
 import sys
 
-import math
 from typing import Any, Dict, List
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if BASE_DIR not in sys.path:
     sys.path.insert(0, BASE_DIR)
 
+import numpy as np
+import pandas as pd
 from flask import Flask, jsonify, request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; fall back to Flask's stdlib encoder
+    orjson = None
 
 from backend.data_model import (
     AccountItem,
@@ -25,10 +34,36 @@ from backend.data_model import (
 from backend.engine.aggregate import aggregate_period
 from backend.engine.simulator import simulate_monthly
 from backend.engine.state import LayoutState, PlanState, ScenarioState
-from backend.statements.ingestion import import_csv_bytes, list_transactions
+from backend.statements.ingestion import get_conn, import_csv_stream, list_transactions, remove_attachments
 import datetime as _dt
 
+
+class OrjsonProvider(JSONProvider):
+    """Routes `jsonify` and `request.get_json` through orjson.
+
+    orjson encodes in C and writes NaN/inf as null, so payloads need no
+    separate sanitizing pass.
+    """
+
+    mimetype = "application/json"
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj).decode("utf-8")
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
+
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 state = ScenarioState()
 plan_state = PlanState()
@@ -39,29 +74,34 @@ INCOME_MODEL = IncomeTableModel()
 SPENDING_MODEL = SpendingTableModel()
 
 
+@functools.lru_cache(maxsize=4096)
 def month_string_to_year_offset(month_str: str, plan_start_year: int) -> float:
-    if not month_str or not str(month_str).strip():
-        return 0.0
-    try:
-        year, month = map(int, str(month_str).split("-"))
-        offset = (year - plan_start_year) + (month - 1) / 12.0
-        return max(0.0, offset)
-    except (ValueError, TypeError):
+    value = month_str.strip() if isinstance(month_str, str) else ""
+    year, _, month = value.partition("-")
+    if not year.isdigit() or not month.isdigit():
         return 0.0
+    offset = (int(year) - plan_start_year) + (int(month) - 1) / 12.0
+    return max(0.0, offset)
+
+
+_MONTH_SUFFIXES = tuple(f"-{month:02d}" for month in range(1, 13))
 
 
 def generate_month_options(start_year: int, years: int) -> list[str]:
-    months: list[str] = []
     if not start_year or not years:
-        return months
-    for year in range(int(start_year), int(start_year) + int(years)):
-        for month in range(1, 13):
-            months.append(f"{year}-{month:02d}")
-    return months
+        return []
+    return [
+        f"{year}{suffix}"
+        for year in range(int(start_year), int(start_year) + int(years))
+        for suffix in _MONTH_SUFFIXES
+    ]
+
+
+TAXABLE_CATEGORIES: frozenset[str] = frozenset({"salary", "bonus", "business"})
 
 
 def is_taxable_income_category(category: str) -> bool:
-    return str(category).strip().lower() in {"salary", "bonus", "business"}
+    return str(category).strip().lower() in TAXABLE_CATEGORIES
 
 
 def parse_accounts(rows: list[dict], plan_start_year: int) -> list[AccountItem]:
@@ -116,18 +156,10 @@ def parse_cashflows(rows: list[dict], plan_start_year: int, flow_type: str) -> l
     return flows
 
 
-def _is_nan(value: Any) -> bool:
-    try:
-        return not math.isfinite(value)
-    except (TypeError, ValueError):
-        return False
-
-
-def _sanitize_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    clean_rows: List[Dict[str, Any]] = []
-    for row in records:
-        clean_rows.append({key: (None if _is_nan(value) else value) for key, value in row.items()})
-    return clean_rows
+def _frame_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a frame to JSON-safe records, mapping NaN/inf to None column-wise."""
+    clean = df.replace([np.inf, -np.inf], np.nan)
+    return clean.astype(object).where(clean.notna(), None).to_dict("records")
 
 
 def _model_payload(model: AccountTableModel | IncomeTableModel | SpendingTableModel) -> Dict[str, Any]:
@@ -149,7 +181,7 @@ def _model_payload(model: AccountTableModel | IncomeTableModel | SpendingTableMo
         )
         if col.kind == "select" and not col.options:
             month_fields.append(col.field)
-    defaults = _sanitize_records(model.create_default_df().to_dict("records"))
+    defaults = model.default_records()
     return {
         "name": model.name,
         "columns": columns,
@@ -164,7 +196,7 @@ def _aggregated_payload(freq: str) -> Dict[str, Any]:
     if monthly_all.empty:
         return {"scenarios": state.list_names(), "data": [], "freq": freq}
     agg_df = aggregate_period(monthly_all, freq=freq)
-    records = _sanitize_records(agg_df.to_dict(orient="records"))
+    records = agg_df.to_dict(orient="records") if isinstance(app.json, OrjsonProvider) else _frame_records(agg_df)
     return {
         "scenarios": state.list_names(),
         "freq": freq,
@@ -172,11 +204,58 @@ def _aggregated_payload(freq: str) -> Dict[str, Any]:
     }
 
 
-def _extract_payload_value(payload: dict, *keys: str, default=None):
-    for key in keys:
-        if key in payload and payload[key] is not None:
-            return payload[key]
-    return default
+def _dumps(payload: Dict[str, Any]) -> bytes | str:
+    if isinstance(app.json, OrjsonProvider):
+        return app.json.dumps_bytes(payload)
+    return app.json.dumps(payload)
+
+
+_AGGREGATE_FREQS = frozenset({"M", "Q", "Y"})
+# One (state version, {freq: body}) slot, replaced wholesale when `state` changes
+# so concurrent requests never iterate or clear a dict another thread is filling.
+_aggregate_cache: tuple[int, Dict[str, bytes | str]] = (-1, {})
+
+
+def _aggregated_response(freq: str):
+    """Serve aggregated scenarios, re-aggregating only after `state` changes."""
+    global _aggregate_cache
+    freq = (freq or "Q").upper()
+    if freq not in _AGGREGATE_FREQS:
+        # aggregate_period treats anything else as monthly; don't let arbitrary
+        # client values grow the cache.
+        return app.response_class(_dumps(_aggregated_payload(freq)), mimetype=app.json.mimetype)
+    version = state.version
+    cached_version, bodies = _aggregate_cache
+    if cached_version != version:
+        bodies = {}
+        _aggregate_cache = (version, bodies)
+    body = bodies.get(freq)
+    if body is None:
+        body = _dumps(_aggregated_payload(freq))
+        bodies[freq] = body
+    return app.response_class(body, mimetype=app.json.mimetype)
+
+
+def _parse_add_scenario_payload(payload: dict) -> tuple[str, str, int, int, float, float]:
+    """Return (freq, name, start_year, years, tax_rate_pct, living_inflation_pct).
+
+    Each field accepts its camelCase name or a legacy alias; a None value counts
+    as missing. Raises TypeError/ValueError on non-numeric plan parameters.
+    """
+    get = payload.get
+    freq = get("freq") if get("freq") is not None else get("frequency")
+    name = get("name") if get("name") is not None else get("planName")
+    start_year = get("startYear") if get("startYear") is not None else get("planStartYear")
+    years = get("years") if get("years") is not None else get("planYears")
+    tax_rate = get("taxRate") if get("taxRate") is not None else get("tax_rate")
+    return (
+        str(freq or "Q").upper(),
+        str(name if name is not None else "Scenario").strip() or "Scenario",
+        int(start_year if start_year is not None else 2024),
+        int(years if years is not None else 1),
+        float(tax_rate if tax_rate is not None else 0.0),
+        float(get("livingInflationRate", 0.0) or 0.0),
+    )
 
 
 @app.after_request
@@ -187,13 +266,37 @@ def apply_cors_headers(response):
     return response
 
 
+GZIP_MIN_SIZE = 1024
+
+
+@app.after_request
+def compress_response(response):
+    """Gzip sizeable JSON bodies for clients that accept it."""
+    if (
+        response.direct_passthrough
+        or response.status_code != 200
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "").lower()
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=4))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
 @app.get("/api/health")
 def healthcheck():
     return jsonify({"status": "ok"})
 
 
-@app.get("/api/schema")
-def get_schema():
+@functools.lru_cache(maxsize=1)
+def _schema_json() -> str:
+    """Serialize the schema payload once; table models are immutable singletons."""
     payload = {
         "planDefaults": {
             "name": "MyPlan",
@@ -212,15 +315,24 @@ def get_schema():
             {"label": "Yearly", "value": "Y"},
         ],
     }
-    return jsonify(payload)
+    return app.json.dumps(payload)
+
+
+@app.get("/api/schema")
+def get_schema():
+    return app.response_class(_schema_json(), mimetype=app.json.mimetype)
+
+
+@functools.lru_cache(maxsize=64)
+def _month_options_json(start_year: int, years: int) -> str:
+    return app.json.dumps({"months": generate_month_options(start_year, years)})
 
 
 @app.get("/api/months")
 def month_options():
     start_year = int(request.args.get("startYear", 2024))
     years = int(request.args.get("years", 1))
-    months = generate_month_options(start_year, years)
-    return jsonify({"months": months})
+    return app.response_class(_month_options_json(start_year, years), mimetype=app.json.mimetype)
 
 
 @app.get("/api/plans")
@@ -271,6 +383,24 @@ def save_layout_endpoint():
     return jsonify({"message": "Layout saved."})
 
 
+# Bumped whenever the ledger changes so cached transaction pages are never served stale.
+_tx_version = 0
+
+
+def _bump_tx_version() -> None:
+    global _tx_version
+    _tx_version += 1
+    # Pages cached under older versions can never be hit again; free them now.
+    _cached_transactions.cache_clear()
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_transactions(
+    version: int, account: str | None, limit: int, offset: int, cursor: tuple[str, str] | None = None
+) -> tuple[Dict[str, Any], ...]:
+    return tuple(list_transactions(limit=limit, offset=offset, account=account, cursor=cursor))
+
+
 @app.post("/api/transactions/import")
 def import_transactions_endpoint():
     """Upload and import a CSV statement file.
@@ -290,8 +420,8 @@ def import_transactions_endpoint():
     force_raw = request.form.get("force", "false")
     force = force_raw.lower() == "true"
     print(f"[DEBUG] /api/transactions/import force={force} (raw={force_raw})")
-    data = file.read()
-    result = import_csv_bytes(data, filename, account_name, bank=bank, force=force)
+    result = import_csv_stream(file.stream, filename, account_name, bank=bank, force=force)
+    _bump_tx_version()
     if result.get("error"):
         return jsonify({"error": result["error"]}), 400
     return jsonify({"status": "imported", "result": result})
@@ -308,8 +438,13 @@ def get_transactions_endpoint():
     except Exception:
         offset = 0
     account = request.args.get("account")
-    rows = list_transactions(limit=limit, offset=offset, account=account)
-    return jsonify({"transactions": rows})
+    # Keyset pagination: pass back next_cursor's date/txn_id to fetch the following page.
+    cursor_date = request.args.get("cursor_date")
+    cursor_id = request.args.get("cursor_id")
+    cursor = (cursor_date, cursor_id) if cursor_date is not None and cursor_id is not None else None
+    rows = _cached_transactions(_tx_version, account, limit, offset, cursor)
+    next_cursor = {"date": rows[-1]["date"], "txn_id": rows[-1]["txn_id"]} if rows and len(rows) == limit else None
+    return jsonify({"transactions": list(rows), "next_cursor": next_cursor})
 
 
 @app.get("/api/transactions/summary")
@@ -413,42 +548,26 @@ def delete_transactions_by_account():
         return jsonify({"error": "Missing account parameter"}), 400
     
     try:
-        from statements.ingestion import ensure_db
-        import sqlite3
-        import os
-        
-        ensure_db()
-        db_path = os.path.join(os.path.dirname(__file__), "..", "user_data", "ledger", "transactions.sqlite")
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        
-        # Get import IDs for this account to delete attachments
-        cur.execute("SELECT import_id FROM imports WHERE account_name = ?", (account,))
-        import_ids = [row[0] for row in cur.fetchall()]
-        
-        # Delete transactions
-        cur.execute("DELETE FROM transactions WHERE account = ?", (account,))
-        deleted_count = cur.rowcount
-        
-        # Delete imports and attachments for this account
-        cur.execute("DELETE FROM imports WHERE account_name = ?", (account,))
-        cur.execute("DELETE FROM attachments WHERE import_id IN (SELECT import_id FROM imports WHERE account_name = ?)", (account,))
-        
-        conn.commit()
-        conn.close()
-        
-        # Delete attachment files from disk
-        attachments_dir = os.path.join(os.path.dirname(__file__), "..", "user_data", "statements", "attachments")
-        for import_id in import_ids:
-            try:
-                for filename in os.listdir(attachments_dir):
-                    if filename.startswith(import_id):
-                        filepath = os.path.join(attachments_dir, filename)
-                        if os.path.isfile(filepath):
-                            os.remove(filepath)
-            except Exception:
-                pass  # Continue even if file deletion fails
-        
+        conn = get_conn()
+        # One transaction; attachments must go before the imports they reference.
+        with conn:
+            cur = conn.cursor()
+            cur.execute("SELECT import_id FROM imports WHERE account_name = ?", (account,))
+            import_ids = {row[0] for row in cur.fetchall()}
+
+            cur.execute("DELETE FROM transactions WHERE account = ?", (account,))
+            deleted_count = cur.rowcount
+
+            cur.execute(
+                "DELETE FROM attachments WHERE import_id IN (SELECT import_id FROM imports WHERE account_name = ?)",
+                (account,),
+            )
+            cur.execute("DELETE FROM imports WHERE account_name = ?", (account,))
+        _bump_tx_version()
+
+        # Delete attachment files from disk; failures there don't undo the DB delete
+        remove_attachments(import_ids)
+
         return jsonify({"status": "deleted", "count": deleted_count, "account": account})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -457,19 +576,14 @@ def delete_transactions_by_account():
 @app.get("/api/scenarios")
 def list_scenarios():
     freq = request.args.get("freq", "Q")
-    return jsonify(_aggregated_payload(freq))
+    return _aggregated_response(freq)
 
 
 @app.post("/api/scenarios")
 def add_scenario():
     payload = request.get_json(silent=True) or {}
-    freq = str(_extract_payload_value(payload, "freq", "frequency", default="Q") or "Q").upper()
     try:
-        name = str(_extract_payload_value(payload, "name", "planName", default="Scenario")).strip() or "Scenario"
-        start_year = int(_extract_payload_value(payload, "startYear", "planStartYear", default=2024))
-        years = int(_extract_payload_value(payload, "years", "planYears", default=1))
-        tax_rate = float(_extract_payload_value(payload, "taxRate", "tax_rate", default=0.0))
-        living_inflation_rate_pct = float(payload.get("livingInflationRate", 0.0) or 0.0)
+        freq, name, start_year, years, tax_rate, living_inflation_rate_pct = _parse_add_scenario_payload(payload)
     except (TypeError, ValueError):
         return jsonify({"error": "Invalid plan parameters."}), 400
     living_inflation_rate = living_inflation_rate_pct / 100.0
@@ -498,9 +612,13 @@ def add_scenario():
         living_inflation_rate=living_inflation_rate,
     )
 
-    df_monthly = simulate_monthly(cfg)
+    cache_key = cfg.cache_key()
+    df_monthly = state.cached_simulation(cache_key)
+    if df_monthly is None:
+        df_monthly = simulate_monthly(cfg)
+        state.remember_simulation(cache_key, df_monthly)
     state.add_scenario(name, df_monthly)
-    return jsonify(_aggregated_payload(freq))
+    return _aggregated_response(freq)
 
 
 @app.delete("/api/scenarios")
@@ -510,4 +628,9 @@ def clear_scenarios():
 
 
 if __name__ == "__main__":
-    app.run(debug=False, port=8000)
+    try:
+        from waitress import serve
+    except ImportError:  # optional; Flask's dev server still handles requests on threads
+        app.run(debug=False, port=8000, threaded=True)
+    else:
+        serve(app, host="127.0.0.1", port=8000, threads=8)
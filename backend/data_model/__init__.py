@@ -1,11 +1,13 @@
 from .accounts import (
     ACCOUNT_CATEGORIES,
     END_ACTION_OPTIONS,
+    AccountArrays,
     AccountItem,
     AccountTableModel,
     dataframe_to_accounts,
 )
 from .cashflow import (
+    CashflowArrays,
     CashflowItem,
     IncomeTableModel,
     SpendingTableModel,
@@ -16,8 +18,10 @@ from .plan import PlanConfig
 __all__ = [
     "ACCOUNT_CATEGORIES",
     "END_ACTION_OPTIONS",
+    "AccountArrays",
     "AccountItem",
     "AccountTableModel",
+    "CashflowArrays",
     "CashflowItem",
     "IncomeTableModel",
     "SpendingTableModel",
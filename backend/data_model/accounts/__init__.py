@@ -1,11 +1,12 @@
 from .constants import ACCOUNT_CATEGORIES, END_ACTION_OPTIONS
 from .defaults import default_account_rows
-from .items import AccountItem, dataframe_to_accounts
+from .items import AccountArrays, AccountItem, dataframe_to_accounts
 from .table import AccountTableModel
 
 __all__ = [
     "ACCOUNT_CATEGORIES",
     "END_ACTION_OPTIONS",
+    "AccountArrays",
     "AccountItem",
     "AccountTableModel",
     "dataframe_to_accounts",
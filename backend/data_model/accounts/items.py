@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from typing import List, Sequence
 
+import numpy as np
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AccountItem:
     name: str
     category: str
@@ -25,6 +26,40 @@ class AccountItem:
         return rate / 12.0
 
 
+@dataclass(slots=True, frozen=True)
+class AccountArrays:
+    """Column-wise (struct-of-arrays) view of a list of `AccountItem`s."""
+
+    name: np.ndarray
+    category: np.ndarray
+    principal: np.ndarray
+    apr: np.ndarray
+    interest_rate: np.ndarray
+    start_year: np.ndarray
+    end_year: np.ndarray
+    end_action: np.ndarray
+
+    @classmethod
+    def from_items(cls, items: Sequence[AccountItem]) -> "AccountArrays":
+        n = len(items)
+        return cls(
+            name=np.array([item.name for item in items], dtype=object),
+            category=np.array([item.normalized_category() for item in items], dtype=object),
+            principal=np.fromiter((item.principal for item in items), dtype=np.float64, count=n),
+            apr=np.fromiter((item.apr for item in items), dtype=np.float64, count=n),
+            interest_rate=np.fromiter((item.interest_rate for item in items), dtype=np.float64, count=n),
+            start_year=np.fromiter((item.start_year for item in items), dtype=np.float64, count=n),
+            end_year=np.fromiter((item.end_year for item in items), dtype=np.float64, count=n),
+            end_action=np.array([item.end_action for item in items], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.principal)
+
+    def monthly_rate(self) -> np.ndarray:
+        return np.where(self.apr != 0, self.apr, self.interest_rate) / 12.0
+
+
 def dataframe_to_accounts(df: pd.DataFrame) -> List[AccountItem]:
     items: List[AccountItem] = []
     for row in df.to_dict("records"):
@@ -6,7 +6,7 @@ from typing import Any, List
 import pandas as pd
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ColumnDefinition:
     """Lightweight schema descriptor used by Streamlit editors."""
 
@@ -21,7 +21,7 @@ class ColumnDefinition:
     help: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class TableModel:
     """Container for a table schema plus default rows."""
 
@@ -29,9 +29,11 @@ class TableModel:
     columns: List[ColumnDefinition]
     default_rows: List[dict[str, Any]] = field(default_factory=list)
 
-    def create_default_df(self) -> pd.DataFrame:
+    def default_records(self) -> List[dict[str, Any]]:
         if self.default_rows:
-            return pd.DataFrame(self.default_rows)
-        seed = {col.field: col.default for col in self.columns}
-        return pd.DataFrame([seed])
+            return [dict(row) for row in self.default_rows]
+        return [{col.field: col.default for col in self.columns}]
+
+    def create_default_df(self) -> pd.DataFrame:
+        return pd.DataFrame(self.default_records())
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Literal
+from typing import List, Literal, Sequence
 
+import numpy as np
 import pandas as pd
 
 from .base import ColumnDefinition, TableModel
@@ -101,7 +102,7 @@ class SpendingTableModel(TableModel):
         super().__init__("spending", columns, _spending_defaults())
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CashflowItem:
     name: str
     annual_amount: float
@@ -115,24 +116,69 @@ class CashflowItem:
         return self.annual_amount / 12.0
 
 
+@dataclass(slots=True, frozen=True)
+class CashflowArrays:
+    """Column-wise (struct-of-arrays) view of a list of `CashflowItem`s."""
+
+    name: np.ndarray
+    category: np.ndarray
+    annual_amount: np.ndarray
+    start_year: np.ndarray
+    end_year: np.ndarray
+    taxable: np.ndarray
+
+    @classmethod
+    def from_items(cls, items: Sequence[CashflowItem]) -> "CashflowArrays":
+        n = len(items)
+        return cls(
+            name=np.array([item.name for item in items], dtype=object),
+            category=np.array([item.category for item in items], dtype=object),
+            annual_amount=np.fromiter((item.annual_amount for item in items), dtype=np.float64, count=n),
+            start_year=np.fromiter((item.start_year for item in items), dtype=np.float64, count=n),
+            end_year=np.fromiter((item.end_year for item in items), dtype=np.float64, count=n),
+            taxable=np.fromiter((bool(item.taxable) for item in items), dtype=bool, count=n),
+        )
+
+    def __len__(self) -> int:
+        return len(self.annual_amount)
+
+    def amount_per_month(self) -> np.ndarray:
+        return self.annual_amount / 12.0
+
+
+def _column(df: pd.DataFrame, field: str, default: object) -> pd.Series:
+    if field not in df.columns:
+        return pd.Series(default, index=df.index)
+    return df[field].where(df[field].notna(), default)
+
+
+def _numeric_column(df: pd.DataFrame, field: str) -> np.ndarray:
+    return pd.to_numeric(_column(df, field, 0.0), errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+
+
 def dataframe_to_cashflows(df: pd.DataFrame, flow_type: Literal["income", "spending"]) -> List[CashflowItem]:
-    rows: List[CashflowItem] = []
-    for row in df.to_dict("records"):
-        name = str(row.get("Name", "")).strip()
-        if not name:
-            continue
-        amount = float(row.get("Annual Amount", 0.0) or 0.0)
-        if amount == 0.0:
-            continue
-        rows.append(
-            CashflowItem(
-                name=name,
-                annual_amount=amount,
-                category=str(row.get("Category", "other")),
-                start_year=float(row.get("Start Year", 0.0) or 0.0),
-                end_year=float(row.get("End Year", 0.0) or 0.0),
-                flow_type=flow_type,
-                taxable=bool(row.get("Taxable", False)),
-            )
+    names = _column(df, "Name", "").astype(str).str.strip().to_numpy()
+    amounts = _numeric_column(df, "Annual Amount")
+    keep = np.flatnonzero((names != "") & (amounts != 0.0))
+    if not keep.size:
+        return []
+    columns = zip(
+        names[keep].tolist(),
+        amounts[keep].tolist(),
+        _column(df, "Category", "other").astype(str).to_numpy()[keep].tolist(),
+        _numeric_column(df, "Start Year")[keep].tolist(),
+        _numeric_column(df, "End Year")[keep].tolist(),
+        _column(df, "Taxable", False).astype(bool).to_numpy()[keep].tolist(),
+    )
+    return [
+        CashflowItem(
+            name=name,
+            annual_amount=amount,
+            category=category,
+            start_year=start_year,
+            end_year=end_year,
+            flow_type=flow_type,
+            taxable=taxable,
         )
-    return rows
+        for name, amount, category, start_year, end_year, taxable in columns
+    ]
@@ -1,11 +1,12 @@
 # data_model/plan.py
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import List
+from dataclasses import astuple, dataclass, field
+from functools import cached_property
+from typing import Hashable, List
 
-from .accounts import AccountItem
-from .cashflow import CashflowItem
+from .accounts import AccountArrays, AccountItem
+from .cashflow import CashflowArrays, CashflowItem
 
 
 @dataclass
@@ -18,3 +19,29 @@ class PlanConfig:
     incomes: List[CashflowItem] = field(default_factory=list)
     spendings: List[CashflowItem] = field(default_factory=list)
     living_inflation_rate: float = 0.0
+
+    def cache_key(self) -> Hashable:
+        """Hashable snapshot of every simulation input, for memoizing results."""
+        return (
+            self.name,
+            self.start_year,
+            self.years,
+            self.tax_rate,
+            self.living_inflation_rate,
+            tuple(astuple(item) for item in self.accounts),
+            tuple(astuple(item) for item in self.incomes),
+            tuple(astuple(item) for item in self.spendings),
+        )
+
+    # Struct-of-arrays views for vectorized consumers; built once per plan.
+    @cached_property
+    def account_arrays(self) -> AccountArrays:
+        return AccountArrays.from_items(self.accounts)
+
+    @cached_property
+    def income_arrays(self) -> CashflowArrays:
+        return CashflowArrays.from_items(self.incomes)
+
+    @cached_property
+    def spending_arrays(self) -> CashflowArrays:
+        return CashflowArrays.from_items(self.spendings)
@@ -3,11 +3,33 @@ import pandas as pd
 REQUIRED_COLUMNS = {"Scenario", "MonthIndex", "CalendarYear", "MonthInYear"}
 
 
+def _is_sorted(df: pd.DataFrame) -> bool:
+    """True when rows are already in (Scenario, MonthIndex) order; one linear pass."""
+    scenario = df["Scenario"]
+    if not scenario.is_monotonic_increasing:
+        return False
+    names = scenario.to_numpy()
+    month = df["MonthIndex"].to_numpy()
+    return bool(((names[1:] != names[:-1]) | (month[1:] >= month[:-1])).all())
+
+
 def _prepare(df: pd.DataFrame) -> pd.DataFrame:
+    """Return `df` in (Scenario, MonthIndex) order; the caller's frame when it already is, so never mutate it."""
     missing = REQUIRED_COLUMNS.difference(df.columns)
     if missing:
         raise KeyError(f"Missing required columns: {', '.join(sorted(missing))}")
-    return df.sort_values(["Scenario", "MonthIndex"]).copy()
+    if _is_sorted(df):
+        return df
+    return df.sort_values(["Scenario", "MonthIndex"])
+
+
+def _last_per_period(df: pd.DataFrame, period_value: pd.Series) -> pd.DataFrame:
+    """Last row of each (Scenario, PeriodValue) run; relies on `_prepare`'s sort order."""
+    scenario = df["Scenario"]
+    is_last = ((scenario != scenario.shift(-1)) | (period_value != period_value.shift(-1))).to_numpy()
+    snapshots = df[is_last].reset_index(drop=True)
+    snapshots.insert(1, "PeriodValue", period_value.to_numpy()[is_last])
+    return snapshots
 
 
 def aggregate_period(df: pd.DataFrame, freq: str = "M") -> pd.DataFrame:
@@ -19,16 +41,12 @@ def aggregate_period(df: pd.DataFrame, freq: str = "M") -> pd.DataFrame:
     df = _prepare(df)
 
     if freq == "Q":
-        df["PeriodValue"] = df["MonthIndex"] // 3
+        df = _last_per_period(df, df["MonthIndex"] // 3)
         quarter = ((df["MonthInYear"] - 1) // 3 + 1).astype(int)
-        df["Period"] = df["CalendarYear"].astype(str) + " Q" + quarter.astype(str)
-        return df.groupby(["Scenario", "PeriodValue"], as_index=False).last()
+        return df.assign(Period=df["CalendarYear"].astype(str) + " Q" + quarter.astype(str))
 
     if freq == "Y":
-        df["PeriodValue"] = df["MonthIndex"] // 12
-        df["Period"] = df["CalendarYear"].astype(str)
-        return df.groupby(["Scenario", "PeriodValue"], as_index=False).last()
+        df = _last_per_period(df, df["MonthIndex"] // 12)
+        return df.assign(Period=df["CalendarYear"].astype(str))
 
-    df["PeriodValue"] = df["MonthIndex"]
-    df["Period"] = df.get("Month", df["MonthIndex"].astype(str))
-    return df
+    return df.assign(PeriodValue=df["MonthIndex"], Period=df.get("Month", df["MonthIndex"].astype(str)))
@@ -1,172 +1,226 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
 import pandas as pd
 
-from ..data_model import AccountItem, CashflowItem, PlanConfig
+try:
+    from numba import njit
+except ImportError:  # optional; the month loop then runs as plain Python
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+from ..data_model import AccountArrays, CashflowArrays, PlanConfig
 
 LIQUID_CATEGORIES = {"cash", "investment"}
+KEEP, LIQUIDATE_TO_CASH, DROP = 0, 1, 2
+END_ACTION_CODES = {"keep": KEEP, "liquidate_to_cash": LIQUIDATE_TO_CASH, "drop": DROP}
+
+
+def _month_windows(start_year: np.ndarray, end_year: np.ndarray, n_months: int) -> tuple[np.ndarray, np.ndarray]:
+    """First and last simulated month for each row; ``end_year <= 0`` runs to the end of the plan."""
+    start_m = np.maximum(0, np.rint(start_year * 12)).astype(np.int64)
+    end_m = np.where(end_year <= 0, n_months - 1, np.minimum(np.rint(end_year * 12), n_months - 1)).astype(np.int64)
+    return start_m, np.maximum(end_m, start_m)
+
+
+@dataclass(slots=True)
+class _AccountState:
+    """Per-account simulation inputs, one array entry per account (primary cash included)."""
+
+    names: list[str]
+    values: np.ndarray
+    initial: np.ndarray
+    rates: np.ndarray
+    start_m: np.ndarray
+    end_m: np.ndarray
+    active: np.ndarray
+    taxable_inv: np.ndarray
+    is_liquid: np.ndarray
+    end_codes: np.ndarray
+    primary: int
+
+
+def _build_account_state(accounts: AccountArrays, n_months: int) -> _AccountState:
+    n = len(accounts)
+    start_m, end_m = _month_windows(accounts.start_year, accounts.end_year, n_months)
+    category = accounts.category
+    state = _AccountState(
+        names=accounts.name.tolist(),
+        values=np.zeros(n),
+        initial=np.where(category == "debt", -np.abs(accounts.principal), accounts.principal),
+        rates=accounts.monthly_rate(),
+        start_m=start_m,
+        end_m=end_m,
+        active=np.zeros(n, dtype=bool),
+        taxable_inv=np.fromiter(
+            (cat == "investment" and "hsa" not in name.lower() for cat, name in zip(category, accounts.name)),
+            dtype=bool,
+            count=n,
+        ),
+        is_liquid=np.isin(category, list(LIQUID_CATEGORIES)),
+        end_codes=np.fromiter(
+            (END_ACTION_CODES.get(action, KEEP) for action in accounts.end_action), dtype=np.int64, count=n
+        ),
+        primary=0,
+    )
+    _ensure_primary_cash(state, category, n_months)
+    return state
+
+
+def _ensure_primary_cash(state: _AccountState, category: np.ndarray, n_months: int) -> None:
+    """Point ``state.primary`` at the first cash account, prepending an empty "Cash Reserve" if there is none."""
+    cash = np.flatnonzero(category == "cash")
+    if cash.size:
+        state.primary = int(cash[0])
+        return
+    state.names.insert(0, "Cash Reserve")
+    state.values = np.insert(state.values, 0, 0.0)
+    state.initial = np.insert(state.initial, 0, 0.0)
+    state.rates = np.insert(state.rates, 0, 0.0)
+    state.start_m = np.insert(state.start_m, 0, 0)
+    state.end_m = np.insert(state.end_m, 0, n_months - 1)
+    state.active = np.insert(state.active, 0, True)
+    state.taxable_inv = np.insert(state.taxable_inv, 0, False)
+    state.is_liquid = np.insert(state.is_liquid, 0, True)
+    state.end_codes = np.insert(state.end_codes, 0, KEEP)
+    state.primary = 0
+
+
+
+@njit(cache=True)
+def _run_months(
+    values,
+    initial,
+    rates,
+    start_m,
+    end_m,
+    active,
+    taxable_inv,
+    end_codes,
+    primary,
+    total_income,
+    total_spending,
+    taxable_income,
+    tax_rate,
+):
+    """Step every account through the plan; returns (account_values, taxable_growth, net_cashflow).
+
+    Primary cash absorbs each month's net cashflow before growth is applied, so months
+    depend on each other and the loop stays sequential. ``values`` and ``active`` are
+    updated in place.
+    """
+    n_accounts = values.shape[0]
+    n_months = total_income.shape[0]
+    account_values = np.empty((n_accounts, n_months))
+    taxable_growth = np.zeros(n_months)
+    net_cashflow = np.empty(n_months)
+    cash_buffer = 0.0
 
+    for m in range(n_months):
+        for i in range(n_accounts):
+            if not active[i] and start_m[i] == m:
+                values[i] = initial[i]
+                active[i] = True
+            if active[i] and taxable_inv[i] and m <= end_m[i]:
+                gain = values[i] * rates[i]
+                if gain > 0.0:
+                    taxable_growth[m] += gain
+
+        net = total_income[m] - total_spending[m] - (taxable_income[m] + taxable_growth[m]) * tax_rate
+        net_cashflow[m] = net
+        if active[primary]:
+            values[primary] += cash_buffer + net
+            cash_buffer = 0.0
+        else:
+            cash_buffer += net
 
-def _build_account_state(item: AccountItem, n_months: int) -> dict:
-    start_m = max(0, int(round(item.start_year * 12)))
-    end_m = n_months - 1 if item.end_year <= 0 else min(int(round(item.end_year * 12)), n_months - 1)
-    if end_m < start_m:
-        end_m = start_m
-    initial_value = item.principal
-    if item.normalized_category() == "debt":
-        initial_value = -abs(initial_value)
-    return {
-        "item": item,
-        "value": 0.0,
-        "initial_value": initial_value,
-        "rate_m": item.monthly_rate(),
-        "start_m": start_m,
-        "end_m": end_m,
-        "active": False,
-        "completed": False,
-        "taxable_investment": item.normalized_category() == "investment" and "hsa" not in item.name.lower(),
-    }
+        for i in range(n_accounts):
+            if active[i] and m <= end_m[i]:
+                values[i] *= 1.0 + rates[i]
 
+        for i in range(n_accounts):
+            if end_m[i] != m or not active[i] or end_codes[i] == KEEP:
+                continue
+            if end_codes[i] == LIQUIDATE_TO_CASH:
+                values[primary] += values[i]
+            values[i] = 0.0
+            active[i] = False
 
-def _build_cashflow_state(item: CashflowItem, n_months: int) -> dict:
-    start_m = max(0, int(round(item.start_year * 12)))
-    end_m = n_months - 1 if item.end_year <= 0 else min(int(round(item.end_year * 12)), n_months - 1)
-    if end_m < start_m:
-        end_m = start_m
-    return {
-        "item": item,
-        "start_m": start_m,
-        "end_m": end_m,
-        "amount_m": item.amount_per_month(),
-        "taxable": getattr(item, "taxable", False),
-    }
+        for i in range(n_accounts):
+            account_values[i, m] = values[i]
 
+    return account_values, taxable_growth, net_cashflow
 
-def _ensure_primary_cash(states: list[dict], n_months: int) -> dict:
-    cash_states = [s for s in states if s["item"].normalized_category() == "cash"]
-    if cash_states:
-        return cash_states[0]
-    virtual_cash = AccountItem(name="Cash Reserve", category="cash", principal=0.0, end_year=0.0)
-    cash_state = _build_account_state(virtual_cash, n_months)
-    cash_state["active"] = True
-    states.insert(0, cash_state)
-    return cash_state
 
+_MONTH_SUFFIXES = np.array([f"-{month:02d}" for month in range(1, 13)])
 
-def simulate_monthly(cfg: PlanConfig) -> pd.DataFrame:
-    n_months = max(1, cfg.years * 12)
-    tax_rate = cfg.tax_rate or 0.0
 
-    account_states = [_build_account_state(item, n_months) for item in cfg.accounts]
-    income_states = [_build_cashflow_state(item, n_months) for item in cfg.incomes]
-    spending_states = [_build_cashflow_state(item, n_months) for item in cfg.spendings]
+@lru_cache(maxsize=64)
+def _month_labels(start_year: int, n_months: int) -> np.ndarray:
+    """Read-only "YYYY-MM" labels for a plan; plans sharing a start year and length reuse them."""
+    months = np.arange(n_months)
+    labels = np.char.add((start_year + months // 12).astype(str), _MONTH_SUFFIXES[months % 12]).astype(object)
+    labels.flags.writeable = False
+    return labels
 
-    primary_cash = _ensure_primary_cash(account_states, n_months)
-    records = []
-    cash_buffer = 0.0
 
-    for m in range(n_months):
-        year_num = m // 12
-        month_in_year = (m % 12) + 1
-        calendar_year = cfg.start_year + year_num
-        month_label = f"{calendar_year}-{month_in_year:02d}"
-
-        def _sum_cashflow(states: list[dict]) -> float:
-            return sum(state["amount_m"] for state in states if state["start_m"] <= m <= state["end_m"])
-
-        total_income = _sum_cashflow(income_states)
-        total_spending = 0.0
-        taxable_income = sum(
-            state["amount_m"]
-            for state in income_states
-            if state["start_m"] <= m <= state["end_m"] and state.get("taxable", False)
-        )
-
-        for state in account_states:
-            if state.get("completed"):
-                continue
-            if m >= state["start_m"] and not state["active"]:
-                state["value"] = state["initial_value"]
-                state["active"] = True
-
-        taxable_investment_growth = 0.0
-        for state in account_states:
-            if not state["active"] or state.get("completed"):
-                continue
-            if m <= state["end_m"] and state.get("taxable_investment", False):
-                monthly_yield = max(0.0, state["value"] * state["rate_m"])
-                taxable_investment_growth += monthly_yield
+def _cashflow_matrix(flows: CashflowArrays, months: np.ndarray) -> np.ndarray:
+    """(n_flows, n_months) monthly amounts, zero outside each flow's active window."""
+    start_m, end_m = _month_windows(flows.start_year, flows.end_year, len(months))
+    window = (months >= start_m[:, None]) & (months <= end_m[:, None])
+    return np.where(window, flows.amount_per_month()[:, None], 0.0)
 
-        for state in spending_states:
-            if not (state["start_m"] <= m <= state["end_m"]):
-                continue
-            years_elapsed = max(0.0, (m - state["start_m"]) / 12.0)
-            rate = state.get("inflation_rate", 0.0) or 0.0
-            multiplier = (1.0 + rate) ** years_elapsed if rate else 1.0
-            total_spending += state["amount_m"] * multiplier
 
-        taxable_base = taxable_income + taxable_investment_growth
-        tax_amount = taxable_base * tax_rate
-        net_cashflow = total_income - total_spending - tax_amount
-
-        if primary_cash["active"]:
-            primary_cash["value"] += cash_buffer
-            cash_buffer = 0.0
-            primary_cash["value"] += net_cashflow
-        else:
-            cash_buffer += net_cashflow
-
-        for state in account_states:
-            if not state["active"] or state.get("completed"):
-                continue
-            if m <= state["end_m"]:
-                state["value"] *= 1 + state["rate_m"]
-
-        for state in account_states:
-            if state["active"] and m == state["end_m"]:
-                action = state["item"].end_action
-                if action == "liquidate_to_cash":
-                    primary_cash["value"] += state["value"]
-                    state["value"] = 0.0
-                    state["active"] = False
-                    state["completed"] = True
-                elif action == "drop":
-                    state["value"] = 0.0
-                    state["active"] = False
-                    state["completed"] = True
-                else:
-                    state["rate_m"] = 0.0
-
-        snapshot = {
-            "Scenario": cfg.name,
-            "MonthIndex": m,
-            "Month": month_label,
-            "CalendarYear": calendar_year,
-            "MonthInYear": month_in_year,
-            "TotalIncome": total_income,
-            "TotalSpending": total_spending,
-            "TaxableIncome": taxable_income,
-            "TaxableInvestmentGrowth": taxable_investment_growth,
-            "TaxableBase": taxable_base,
-            "TotalTax": tax_amount,
-            "NetCashflow": net_cashflow,
-        }
-
-        total_assets = 0.0
-        total_debt = 0.0
-        liquid_total = 0.0
-
-        for state in account_states:
-            label = state["item"].name
-            snapshot[label] = state["value"]
-            if state["value"] >= 0:
-                total_assets += state["value"]
-            else:
-                total_debt += state["value"]
-
-            if state["item"].normalized_category() in LIQUID_CATEGORIES:
-                liquid_total += state["value"]
-
-        snapshot["Liquid"] = liquid_total
-        snapshot["NetWorth"] = total_assets + total_debt
-        records.append(snapshot)
-
-    return pd.DataFrame(records)
+def simulate_monthly(cfg: PlanConfig) -> pd.DataFrame:
+    n_months = max(1, cfg.years * 12)
+    tax_rate = cfg.tax_rate or 0.0
+    months = np.arange(n_months)
+
+    accounts = _build_account_state(cfg.account_arrays, n_months)
+
+    income_matrix = _cashflow_matrix(cfg.income_arrays, months)
+    total_income = income_matrix.sum(axis=0)
+    taxable_income = income_matrix[cfg.income_arrays.taxable].sum(axis=0)
+    total_spending = _cashflow_matrix(cfg.spending_arrays, months).sum(axis=0)
+
+    account_values, taxable_growth, net_cashflow = _run_months(
+        accounts.values,
+        accounts.initial,
+        accounts.rates,
+        accounts.start_m,
+        accounts.end_m,
+        accounts.active,
+        accounts.taxable_inv,
+        accounts.end_codes,
+        accounts.primary,
+        total_income,
+        total_spending,
+        taxable_income,
+        tax_rate,
+    )
+
+    taxable_base = taxable_income + taxable_growth
+    calendar_year = cfg.start_year + months // 12
+    month_in_year = months % 12 + 1
+    columns = {
+        "Scenario": np.full(n_months, cfg.name, dtype=object),
+        "MonthIndex": months,
+        "Month": _month_labels(cfg.start_year, n_months),
+        "CalendarYear": calendar_year,
+        "MonthInYear": month_in_year,
+        "TotalIncome": total_income,
+        "TotalSpending": total_spending,
+        "TaxableIncome": taxable_income,
+        "TaxableInvestmentGrowth": taxable_growth,
+        "TaxableBase": taxable_base,
+        "TotalTax": taxable_base * tax_rate,
+        "NetCashflow": net_cashflow,
+    }
+    for name, values in zip(accounts.names, account_values):
+        columns[name] = values
+    columns["Liquid"] = account_values[accounts.is_liquid].sum(axis=0)
+    columns["NetWorth"] = account_values.sum(axis=0)
+    return pd.DataFrame(columns)
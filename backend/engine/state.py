@@ -1,5 +1,7 @@
 # engine/state.py
-from typing import Dict
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable
 import pandas as pd
 from .storage import (
     load_scenarios,
@@ -11,25 +13,61 @@ from .storage import (
 )
 
 class ScenarioState:
+    simulation_cache_size = 64
+
     def __init__(self, storage_path: str = "user_data/scenarios.json"):
         self.storage_path = storage_path
         self.scenarios: Dict[str, pd.DataFrame] = load_scenarios(storage_path)
+        # Bumped on every mutation so readers can key caches on it.
+        self.version = 0
+        # LRU of PlanConfig.cache_key() -> simulate_monthly output; frames are never mutated.
+        self._simulations: "OrderedDict[Hashable, pd.DataFrame]" = OrderedDict()
+        # Request threads share the LRU; lookups reorder it and inserts evict from it.
+        self._simulations_lock = threading.Lock()
+        # get_all_monthly() result; dropped whenever `scenarios` changes. Mutations and the
+        # cache fill share one lock so a concat of the old scenarios is never stored.
+        self._concat_cache: pd.DataFrame | None = None
+        self._lock = threading.Lock()
+
+    def cached_simulation(self, key: Hashable) -> pd.DataFrame | None:
+        with self._simulations_lock:
+            df = self._simulations.get(key)
+            if df is not None:
+                self._simulations.move_to_end(key)
+            return df
+
+    def remember_simulation(self, key: Hashable, df: pd.DataFrame) -> None:
+        with self._simulations_lock:
+            self._simulations[key] = df
+            self._simulations.move_to_end(key)
+            while len(self._simulations) > self.simulation_cache_size:
+                self._simulations.popitem(last=False)
 
     def add_scenario(self, name: str, df: pd.DataFrame) -> None:
-        self.scenarios[name] = df
-        self._save()
+        with self._lock:
+            self.scenarios[name] = df
+            self.version += 1
+            self._concat_cache = None
+            self._save()
 
     def clear(self) -> None:
-        self.scenarios = {}
-        self._save()
+        with self._lock:
+            self.scenarios = {}
+            self.version += 1
+            self._concat_cache = None
+            self._save()
 
     def _save(self):
         save_scenarios(self.storage_path, self.scenarios)
 
     def get_all_monthly(self) -> pd.DataFrame:
-        if not self.scenarios:
-            return pd.DataFrame()
-        return pd.concat(self.scenarios.values(), ignore_index=True)
+        """All scenarios stacked into one frame; shared between callers, so treat it as read-only."""
+        with self._lock:
+            if not self.scenarios:
+                return pd.DataFrame()
+            if self._concat_cache is None:
+                self._concat_cache = pd.concat(self.scenarios.values(), ignore_index=True)
+            return self._concat_cache
 
     def list_names(self):
         return list(self.scenarios.keys())
@@ -1,10 +1,21 @@
 # engine/storage.py
+import hashlib
 import os
 import json
 import math
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
+
+# path -> digest of the bytes last written there, so unchanged saves skip the disk.
+_written_digests: Dict[str, bytes] = {}
+
 
 def ensure_user_data_dir(path: str) -> None:
     folder = os.path.dirname(path)
@@ -12,6 +23,44 @@ def ensure_user_data_dir(path: str) -> None:
         os.makedirs(folder, exist_ok=True)
 
 
+def _dumps(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(obj).encode("utf-8")
+
+
+def _write_json_atomic(path: str, obj: Any) -> None:
+    """Encode `obj` and swap it into `path` via a temp file; no-op if the bytes are unchanged."""
+    data = _dumps(obj)
+    digest = hashlib.blake2b(data).digest()
+    if _written_digests.get(path) == digest and os.path.exists(path):
+        return
+    ensure_user_data_dir(path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    _written_digests[path] = digest
+
+
+_NUMBER_TYPES = frozenset({int, float})
+
+
+def _sanitize_numbers(values: list) -> list:
+    """Fast path for flat lists of ints/floats: one `np.isfinite` pass instead of per-item checks."""
+    try:
+        bad = np.flatnonzero(~np.isfinite(np.asarray(values, dtype=float)))
+    except OverflowError:  # ints too large for float64
+        return [_sanitize_json_compat(item) for item in values]
+    clean = list(values)
+    for i in bad.tolist():
+        clean[i] = None
+    return clean
+
+
 def _sanitize_json_compat(value: Any):
     if isinstance(value, float):
         if math.isnan(value) or math.isinf(value):
@@ -20,17 +69,26 @@ def _sanitize_json_compat(value: Any):
     if isinstance(value, dict):
         return {key: _sanitize_json_compat(val) for key, val in value.items()}
     if isinstance(value, list):
+        if value and _NUMBER_TYPES.issuperset(map(type, value)):
+            return _sanitize_numbers(value)
         return [_sanitize_json_compat(item) for item in value]
     return value
 
 
+def _loads(text: str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN tokens in files written by stdlib json
+    return json.loads(text)
+
+
 def save_scenarios(path: str, scenario_dict: Dict[str, pd.DataFrame]) -> None:
-    ensure_user_data_dir(path)
-    data = {}
-    for name, df in scenario_dict.items():
-        data[name] = df.to_dict(orient="records")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f)
+    # Column-oriented ({column: values}) so keys are not repeated on every row;
+    # pd.DataFrame() reads this as well as the older list-of-records files.
+    data = {name: {column: df[column].tolist() for column in df.columns} for name, df in scenario_dict.items()}
+    _write_json_atomic(path, data)
 
 
 def load_scenarios(path: str) -> Dict[str, pd.DataFrame]:
@@ -41,7 +99,7 @@ def load_scenarios(path: str) -> Dict[str, pd.DataFrame]:
             raw_text = f.read().strip()
             if not raw_text:
                 return {}
-            raw = json.loads(raw_text)
+            raw = _loads(raw_text)
     except (json.JSONDecodeError, OSError):
         return {}
     res = {}
@@ -65,12 +123,7 @@ def load_plans(path: str) -> Dict[str, dict]:
 
 
 def save_plans(path: str, plans: Dict[str, dict]) -> None:
-    ensure_user_data_dir(path)
-    tmp_path = f"{path}.tmp"
-    clean = _sanitize_json_compat(plans)
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(clean, f, allow_nan=False)
-    os.replace(tmp_path, path)
+    _write_json_atomic(path, _sanitize_json_compat(plans))
 
 
 def load_layout(path: str) -> List[dict]:
@@ -88,9 +141,4 @@ def load_layout(path: str) -> List[dict]:
 
 
 def save_layout(path: str, layout: List[dict]) -> None:
-    ensure_user_data_dir(path)
-    tmp_path = f"{path}.tmp"
-    clean = _sanitize_json_compat(layout)
-    with open(tmp_path, "w", encoding="utf-8") as f:
-        json.dump(clean, f, allow_nan=False)
-    os.replace(tmp_path, path)
+    _write_json_atomic(path, _sanitize_json_compat(layout))
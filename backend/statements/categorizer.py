@@ -9,14 +9,22 @@ flags to decide whether to return a pipeline. See docs at bottom of file.
 """
 from __future__ import annotations
 
+import functools
+import http.client
 import json
 import os
 import re
-import urllib.error
-import urllib.request
+import threading
+import urllib.parse
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Callable, Dict, Iterable, Mapping, Optional
 
+try:
+    import ahocorasick
+except ImportError:  # optional; keywords are then matched with one substring test each
+    ahocorasick = None
+
 # Core categories shared by the built-in rules. Feel free to extend.
 DEFAULT_CATEGORIES: tuple[str, ...] = (
     "income",
@@ -80,9 +88,12 @@ DEFAULT_MERCHANT_MAP: Dict[str, str] = {
 }
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
 def _normalize(text: str | None) -> str:
     """Lowercases and collapses whitespace for matching."""
-    return re.sub(r"\s+", " ", str(text or "").strip().lower())
+    return _WHITESPACE_RE.sub(" ", str(text or "").strip().lower())
 
 
 @dataclass
@@ -110,19 +121,70 @@ class RuleBasedCategorizer:
         min_confidence: float = 0.35,
         default_category: str = "other",
     ) -> None:
+        # Keywords are normalized once here so scoring is a plain substring test.
         self.keyword_map: Dict[str, tuple[str, ...]] = {
-            k.lower(): tuple(v) for k, v in (keyword_map or DEFAULT_KEYWORD_MAP).items()
+            k.lower(): tuple(kw for kw in map(_normalize, v) if kw) for k, v in (keyword_map or DEFAULT_KEYWORD_MAP).items()
         }
         self.merchant_map: Dict[str, str] = {k.lower(): v.lower() for k, v in (merchant_map or DEFAULT_MERCHANT_MAP).items()}
         self.min_confidence = min_confidence
         self.default_category = default_category
+        self._automaton = self._build_automaton()
+        self._merchant_automaton = self._build_merchant_automaton()
+        # Statements repeat the same merchants/descriptions, and only the sign of the
+        # amount matters, so results are cached; the maps and thresholds above are
+        # treated as fixed once the categorizer is built.
+        self._classify = functools.lru_cache(maxsize=4096)(self._classify)
+
+    def _build_automaton(self):
+        """One Aho-Corasick automaton over every keyword, valued (keyword, owning categories)."""
+        if ahocorasick is None or not any(self.keyword_map.values()):
+            return None
+        owners: Dict[str, list[str]] = {}
+        for cat, keywords in self.keyword_map.items():
+            for kw in keywords:
+                owners.setdefault(kw, []).append(cat)
+        automaton = ahocorasick.Automaton()
+        for kw, cats in owners.items():
+            automaton.add_word(kw, (kw, tuple(cats)))
+        automaton.make_automaton()
+        return automaton
+
+    def _build_merchant_automaton(self):
+        """Automaton over merchant keys, valued (insertion index, category)."""
+        if ahocorasick is None or not self.merchant_map:
+            return None
+        automaton = ahocorasick.Automaton()
+        for index, (key, cat) in enumerate(self.merchant_map.items()):
+            if not key:
+                # an empty key matches every merchant; the scan handles it
+                return None
+            automaton.add_word(key, (index, cat))
+        automaton.make_automaton()
+        return automaton
+
+    def _merchant_contains(self, merchant_norm: str) -> str | None:
+        """Category of the first merchant key (in map order) contained in `merchant_norm`."""
+        if self._merchant_automaton is None:
+            return next((cat for key, cat in self.merchant_map.items() if key in merchant_norm), None)
+        match = min((value for _, value in self._merchant_automaton.iter(merchant_norm)), default=None)
+        return match[1] if match else None
+
+    def _keyword_hits(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords of each category found in `text`."""
+        if self._automaton is None:
+            return {cat: sum([kw in text for kw in keywords]) for cat, keywords in self.keyword_map.items()}
+        hits = dict.fromkeys(self.keyword_map, 0)
+        for _, cats in {value for _, value in self._automaton.iter(text)}:
+            for cat in cats:
+                hits[cat] += 1
+        return hits
 
     def _score_keywords(self, text: str, keywords: Iterable[str]) -> float:
-        hits = 0
-        for kw in keywords:
-            kw_norm = _normalize(kw)
-            if kw_norm and kw_norm in text:
-                hits += 1
+        """Score `text` against already-normalized `keywords` (see `__init__`)."""
+        return self._score_hits(sum([kw in text for kw in keywords]))
+
+    @staticmethod
+    def _score_hits(hits: int) -> float:
         if hits == 0:
             return 0.0
         # Scale with diminishing returns; cap at 1.0
@@ -135,35 +197,38 @@ class RuleBasedCategorizer:
         merchant: str | None = None,
         mcc: str | None = None,
     ) -> CategorizationResult | None:
-        text = _normalize(description)
-        merchant_norm = _normalize(merchant)
+        # A missing amount only matters to the income preference on the keyword path; treat it as not positive.
+        positive = amount is not None and amount > 0
+        category, confidence, source, merchant_norm = self._classify(_normalize(description), _normalize(merchant), positive)
+        return CategorizationResult(category=category, confidence=confidence, source=source, merchant=merchant_norm)
 
+    def _classify(self, text: str, merchant_norm: str, positive: bool) -> tuple[str, float, str, str | None]:
+        """Rule evaluation on normalized inputs; memoized per instance (see `__init__`)."""
         # Merchant map exact/contains match
         if merchant_norm:
             if merchant_norm in self.merchant_map:
-                cat = self.merchant_map[merchant_norm]
-                return CategorizationResult(category=cat, confidence=0.9, source="rules-merchant", merchant=merchant_norm)
+                return self.merchant_map[merchant_norm], 0.9, "rules-merchant", merchant_norm
             # fallback: contains any merchant key
-            for key, cat in self.merchant_map.items():
-                if key in merchant_norm:
-                    return CategorizationResult(category=cat, confidence=0.75, source="rules-merchant", merchant=merchant_norm)
+            cat = self._merchant_contains(merchant_norm)
+            if cat is not None:
+                return cat, 0.75, "rules-merchant", merchant_norm
 
         # Keyword scoring
         best_cat = None
         best_score = 0.0
-        for cat, keywords in self.keyword_map.items():
-            score = self._score_keywords(text, keywords)
+        for cat, hits in self._keyword_hits(text).items():
+            score = self._score_hits(hits)
             # Slight preference for positive amounts mapping to income-ish categories
-            if amount > 0 and cat in ("income", "salary", "bonus"):
+            if positive and cat in ("income", "salary", "bonus"):
                 score += 0.1
             if score > best_score:
                 best_score = score
                 best_cat = cat
 
         if best_cat and best_score >= self.min_confidence:
-            return CategorizationResult(category=best_cat, confidence=min(best_score, 1.0), source="rules", merchant=merchant_norm or None)
+            return best_cat, min(best_score, 1.0), "rules", merchant_norm or None
 
-        return CategorizationResult(category=self.default_category, confidence=0.0, source="rules-fallback", merchant=merchant_norm or None)
+        return self.default_category, 0.0, "rules-fallback", merchant_norm or None
 
 
 class ExternalAPICategorizer:
@@ -178,6 +243,34 @@ class ExternalAPICategorizer:
         self.url = url
         self.api_key = api_key
         self.timeout = timeout
+        parts = urllib.parse.urlsplit(url)
+        self._connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        self._headers = {"Content-Type": "application/json"}
+        if api_key:
+            self._headers["Authorization"] = f"Bearer {api_key}"
+        # One keep-alive connection per thread; http.client connections are not thread-safe.
+        self._local = threading.local()
+
+    def _post(self, data: bytes) -> bytes | None:
+        """POST on the pooled connection, reconnecting once if it went stale."""
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._connection_class(self._netloc, timeout=self.timeout)
+            try:
+                conn.request("POST", self._path, body=data, headers=self._headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    return None
+                continue
+            return body if resp.status < 400 else None
+        return None
 
     def categorize(
         self,
@@ -193,15 +286,12 @@ class ExternalAPICategorizer:
             "mcc": mcc,
         }
         data = json.dumps(payload).encode("utf-8")
-        headers = {"Content-Type": "application/json"}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-        req = urllib.request.Request(self.url, data=data, headers=headers, method="POST")
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                body = resp.read().decode("utf-8")
-                parsed = json.loads(body)
-        except (urllib.error.URLError, ValueError, json.JSONDecodeError):
+            body = self._post(data)
+            if body is None:
+                return None
+            parsed = json.loads(body.decode("utf-8"))
+        except (ValueError, json.JSONDecodeError):
             return None
 
         category = _normalize(parsed.get("category"))
@@ -324,6 +414,50 @@ class CategorizerPipeline:
                 return fb
         return result
 
+    def categorize_many(
+        self,
+        rows: Iterable[Mapping[str, object]],
+        max_concurrency: int = 16,
+        executor: Executor | None = None,
+    ) -> list[CategorizationResult | None]:
+        """Categorize rows of `categorize` keyword arguments, in input order.
+
+        Rules run inline; rows that need the (I/O-bound) fallback are sent to it
+        concurrently. A row whose categorizer raises yields None. Pass `executor` to
+        run fallbacks on long-lived threads across calls, so per-thread state such as
+        keep-alive connections is reused; otherwise a pool of up to `max_concurrency`
+        threads is created for this call.
+        """
+        rows = list(rows)
+        results: list[CategorizationResult | None] = []
+        needs_fallback: list[int] = []
+        for i, row in enumerate(rows):
+            try:
+                result = self.primary.categorize(row.get("description"), row.get("amount"), merchant=row.get("merchant"), mcc=row.get("mcc"))
+            except Exception:
+                result = None
+            results.append(result)
+            if self.fallback and not (result and result.confidence >= self.min_confidence_for_rules):
+                needs_fallback.append(i)
+        if not needs_fallback:
+            return results
+
+        def run_fallback(i: int) -> CategorizationResult | None:
+            row = rows[i]
+            try:
+                return self.fallback(row.get("description"), row.get("amount"), row.get("merchant"), row.get("mcc")) or results[i]
+            except Exception:
+                return None
+
+        pool = executor or ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(needs_fallback))))
+        try:
+            for i, result in zip(needs_fallback, pool.map(run_fallback, needs_fallback)):
+                results[i] = result
+        finally:
+            if executor is None:
+                pool.shutdown()
+        return results
+
 
 def _load_json_mapping(path: str) -> Dict[str, str]:
     if not path or not os.path.exists(path):
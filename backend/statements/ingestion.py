@@ -12,8 +12,16 @@ import io
 import json
 import os
 import sqlite3
+import threading
 import uuid
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import BinaryIO, Callable, Dict, Any, Iterable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
 
 from backend.statements.categorizer import CategorizerPipeline, RuleBasedCategorizer, build_categorizer_from_env
 
@@ -24,6 +32,14 @@ STATEMENTS_DIR = os.path.join(DATA_DIR, "statements")
 ATTACHMENTS_DIR = os.path.join(STATEMENTS_DIR, "attachments")
 DB_PATH = os.path.join(LEDGER_DIR, "transactions.sqlite")
 SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+COPY_CHUNK_SIZE = 64 * 1024
+IMPORT_BATCH_SIZE = 1000
+CATEGORIZE_CONCURRENCY = 16
+
+_INSERT_TXN_SQL = (
+    "INSERT OR IGNORE INTO transactions(txn_id, import_id, date, amount, description, merchant, category, account,"
+    " currency, is_income, confidence, raw_json, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)"
+)
 
 
 def ensure_dirs() -> None:
@@ -31,23 +47,71 @@ def ensure_dirs() -> None:
     os.makedirs(ATTACHMENTS_DIR, exist_ok=True)
 
 
+# DB_PATH already initialized by this process; later ensure_db() calls return
+# without touching the filesystem.
+_db_ready_path: str | None = None
+
+
 def ensure_db() -> None:
-    """Create DB file and run schema if missing."""
+    """Create DB file if missing and apply the schema.
+
+    Every statement in schema.sql is IF NOT EXISTS, so re-running it on an existing
+    ledger only adds indexes introduced since the file was created.
+    """
+    global _db_ready_path
+    if _db_ready_path == DB_PATH:
+        return
     ensure_dirs()
-    need_init = not os.path.exists(DB_PATH)
     conn = sqlite3.connect(DB_PATH)
-    if need_init:
-        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-            sql = f.read()
-        conn.executescript(sql)
-        conn.commit()
+    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+        sql = f.read()
+    conn.executescript(sql)
+    conn.commit()
     conn.close()
+    _db_ready_path = DB_PATH
 
 
-def sha256_bytes(data: bytes) -> str:
-    h = hashlib.sha256()
-    h.update(data)
-    return h.hexdigest()
+# Per-connection tuning for an append-heavy ledger: WAL with synchronous=NORMAL only
+# fsyncs at checkpoints, and a larger page cache / mmap window keeps imports off disk.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, cached_statements=256)
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+_local = threading.local()
+
+
+def get_conn() -> sqlite3.Connection:
+    """Return this thread's ledger connection, opening and tuning it on first use.
+
+    Callers must not close it; wrap multi-statement writes in `with conn:`.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.path == DB_PATH:
+        return conn
+    ensure_db()
+    conn = _connect()
+    _local.conn = conn
+    _local.path = DB_PATH
+    return conn
+
+
+def _row_json(row: Dict[str, Any]) -> str:
+    """Serialize a parsed CSV row for `transactions.raw_json` (overflow cells sit under the None key)."""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(row, ensure_ascii=False)
 
 
 def transaction_hash(date: str, amount: float, description: str, account: str) -> str:
@@ -55,21 +119,54 @@ def transaction_hash(date: str, amount: float, description: str, account: str) -
     return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
-def save_attachment(import_id: str, filename: str, data: bytes) -> str:
+def save_attachment_stream(import_id: str, filename: str, stream: BinaryIO) -> tuple[str, str, int]:
+    """Copy an upload stream into the attachments dir chunk by chunk.
+
+    Returns (dest_path, sha256 hex digest, size in bytes); the hash is computed
+    while copying so the upload never has to be held in memory.
+    """
     safe_name = filename.replace("/", "_")
     dest_name = f"{import_id}__{safe_name}"
     dest_path = os.path.join(ATTACHMENTS_DIR, dest_name)
+    h = hashlib.sha256()
+    size = 0
     with open(dest_path, "wb") as f:
-        f.write(data)
-    return dest_path
+        for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b""):
+            h.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return dest_path, h.hexdigest(), size
+
+
+def remove_attachments(import_ids: Iterable[str]) -> int:
+    """Delete attachment files for the given imports in one directory pass.
+
+    Files are named "<import_id>__<filename>" (see `save_attachment_stream`).
+    Returns the number of files removed; unreadable/locked files are skipped.
+    """
+    ids = frozenset(import_ids)
+    if not ids or not os.path.isdir(ATTACHMENTS_DIR):
+        return 0
+    removed = 0
+    with os.scandir(ATTACHMENTS_DIR) as entries:
+        for entry in entries:
+            if entry.name.partition("__")[0] not in ids or not entry.is_file():
+                continue
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
 
 
-def parse_csv_rows(file_bytes: bytes) -> list[Dict[str, Any]]:
-    text = file_bytes.decode("utf-8-sig", errors="replace")
-    stream = io.StringIO(text)
-    reader = csv.DictReader(stream)
-    rows = [r for r in reader]
-    return rows
+def parse_csv_rows(handle: BinaryIO) -> csv.DictReader:
+    """Reader yielding CSV rows as dicts one at a time, decoding `handle` incrementally.
+
+    Its `fieldnames` attribute reads just the header, e.g. for `make_parser`.
+    """
+    stream = io.TextIOWrapper(handle, encoding="utf-8-sig", errors="replace", newline="")
+    return csv.DictReader(stream)
 
 
 def parse_transaction_chase(row: Dict[str, Any]) -> tuple[str, float, str, str] | None:
@@ -143,43 +240,101 @@ def parse_transaction_citi(row: Dict[str, Any]) -> tuple[str, float, str, str] |
     return None
 
 
-def parse_transaction_generic(row: Dict[str, Any]) -> tuple[str, float, str, str] | None:
-    """Parse generic CSV format with Amount, Debit/Credit, or similar columns."""
-    date = (row.get("Date") or row.get("date") or row.get("Transaction Date") or "").strip()
-    desc = (row.get("Description") or row.get("description") or row.get("Transaction Description") or "").strip()
-    category = (row.get("Category") or row.get("category") or "").strip()
-    
-    if not date or not desc:
-        return None
-    
-    amount = 0.0
-    amount_raw = (row.get("Amount") or row.get("amount") or row.get("Debit/Credit") or row.get("Value") or "").strip()
-    
-    if amount_raw:
-        amt = amount_raw.replace("$", "").replace(",", "").replace("\u2009", "")
-        try:
-            amount = float(amt)
-        except (ValueError, AttributeError):
+# Columns tried in order by the generic parser; the first non-empty value wins.
+_GENERIC_COLUMNS: Dict[str, tuple[str, ...]] = {
+    "date": ("Date", "date", "Transaction Date"),
+    "desc": ("Description", "description", "Transaction Description"),
+    "category": ("Category", "category"),
+    "amount": ("Amount", "amount", "Debit/Credit", "Value"),
+    "debit": ("Debit",),
+    "credit": ("Credit",),
+}
+
+# Stands in for a field none of whose columns are in the header; never a row key.
+_NO_COLUMN = object()
+
+
+def _split_columns(cols: tuple[str, ...]) -> tuple[Any, tuple[str, ...]]:
+    return (cols[0], cols[1:]) if cols else (_NO_COLUMN, ())
+
+
+def _first_value(row: Dict[str, Any], cols: tuple[str, ...]) -> str:
+    for col in cols:
+        value = row.get(col)
+        if value:
+            return value
+    return ""
+
+
+@lru_cache(maxsize=64)
+def _compile_generic_parser(columns: tuple[tuple[str, ...], ...]) -> Callable[[Dict[str, Any]], tuple[str, float, str, str] | None]:
+    """Build the generic parser for per-field column tuples (in `_GENERIC_COLUMNS` order).
+
+    Each field's first column is bound to a local and looked up inline; the remaining
+    alternatives are only scanned when that one is empty. A parser built for one file's
+    header therefore tries only the columns that header can satisfy.
+    """
+    (date_col, date_rest), (desc_col, desc_rest), (category_col, category_rest), \
+        (amount_col, amount_rest), (debit_col, debit_rest), (credit_col, credit_rest) = map(_split_columns, columns)
+
+    def parse_transaction_generic(row: Dict[str, Any]) -> tuple[str, float, str, str] | None:
+        """Parse generic CSV format with Amount, Debit/Credit, or similar columns."""
+        date = (row.get(date_col) or date_rest and _first_value(row, date_rest) or "").strip()
+        desc = (row.get(desc_col) or desc_rest and _first_value(row, desc_rest) or "").strip()
+        category = (row.get(category_col) or category_rest and _first_value(row, category_rest) or "").strip()
+
+        if not date or not desc:
             return None
-    else:
-        # Try separate Debit/Credit columns
-        debit = (row.get("Debit") or "").strip()
-        credit = (row.get("Credit") or "").strip()
-        
-        if debit and debit.upper() != "DEBIT":
-            try:
-                amount = float(debit.replace("$", "").replace(",", "").replace("\u2009", ""))
-            except (ValueError, AttributeError):
-                pass
-        elif credit and credit.upper() != "CREDIT":
+
+        amount = 0.0
+        amount_raw = (row.get(amount_col) or amount_rest and _first_value(row, amount_rest) or "").strip()
+
+        if amount_raw:
+            amt = amount_raw.replace("$", "").replace(",", "").replace("\u2009", "")
             try:
-                amount = -float(credit.replace("$", "").replace(",", "").replace("\u2009", ""))
+                amount = float(amt)
             except (ValueError, AttributeError):
-                pass
+                return None
         else:
-            return None
-    
-    return (date, amount, desc, category)
+            # Try separate Debit/Credit columns
+            debit = (row.get(debit_col) or debit_rest and _first_value(row, debit_rest) or "").strip()
+            credit = (row.get(credit_col) or credit_rest and _first_value(row, credit_rest) or "").strip()
+
+            if debit and debit.upper() != "DEBIT":
+                try:
+                    amount = float(debit.replace("$", "").replace(",", "").replace("\u2009", ""))
+                except (ValueError, AttributeError):
+                    pass
+            elif credit and credit.upper() != "CREDIT":
+                try:
+                    amount = -float(credit.replace("$", "").replace(",", "").replace("\u2009", ""))
+                except (ValueError, AttributeError):
+                    pass
+            else:
+                return None
+
+        return (date, amount, desc, category)
+
+    return parse_transaction_generic
+
+
+parse_transaction_generic = _compile_generic_parser(tuple(_GENERIC_COLUMNS.values()))
+
+
+def make_parser(fieldnames: Iterable[str] | None, bank: str | None = None) -> Callable[[Dict[str, Any]], tuple[str, float, str, str] | None]:
+    """Row parser for `bank`, specialized to a file's header.
+
+    The generic parser is built to look up only the alternative column names
+    that actually appear in `fieldnames`, resolved once per file instead of per row.
+    """
+    if bank == "citi":
+        return parse_transaction_citi
+    if bank == "chase":
+        return parse_transaction_chase
+    if fieldnames is None:
+        return parse_transaction_generic
+    present = set(fieldnames)
+    return _compile_generic_parser(tuple(tuple(c for c in cols if c in present) for cols in _GENERIC_COLUMNS.values()))
 
 
 def import_csv_bytes(
@@ -191,10 +346,34 @@ def import_csv_bytes(
     auto_categorize: bool = False,
     categorizer: Optional[CategorizerPipeline] = None,
 ) -> Dict[str, Any]:
-    """Import a CSV (bytes) into the ledger DB.
+    """Import a CSV (bytes) into the ledger DB. See `import_csv_stream`."""
+    return import_csv_stream(
+        io.BytesIO(file_bytes),
+        filename,
+        account_name,
+        bank=bank,
+        force=force,
+        auto_categorize=auto_categorize,
+        categorizer=categorizer,
+    )
+
+
+def import_csv_stream(
+    stream: BinaryIO,
+    filename: str,
+    account_name: str,
+    bank: str | None = None,
+    force: bool = False,
+    auto_categorize: bool = False,
+    categorizer: Optional[CategorizerPipeline] = None,
+) -> Dict[str, Any]:
+    """Import a CSV from a binary stream into the ledger DB.
+
+    The stream is copied to the attachments dir in chunks (hashing on the fly)
+    and parsed back from that copy, so large uploads are never fully buffered.
 
     Args:
-        file_bytes: CSV file content as bytes
+        stream: Binary file-like object with the CSV content
         filename: Original filename
         account_name: Account name to associate with transactions
         bank: Bank name (used to select parser: "citi", "chase", etc.)
@@ -206,10 +385,10 @@ def import_csv_bytes(
     Returns summary dict with import_id and counts.
     """
     ensure_db()
-    fhash = sha256_bytes(file_bytes)
     import_id = f"import-{datetime.datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')}-{str(uuid.uuid4())[:8]}"
+    saved_path, fhash, size = save_attachment_stream(import_id, filename, stream)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = _connect()
     cur = conn.cursor()
 
     # Check file hash (unless force=True)
@@ -217,36 +396,21 @@ def import_csv_bytes(
         cur.execute("SELECT import_id FROM imports WHERE file_hash = ?", (fhash,))
         if cur.fetchone():
             conn.close()
+            os.remove(saved_path)
             return {"error": "File already imported", "imported": False}
 
-    # Parse rows
-    try:
-        rows = parse_csv_rows(file_bytes)
-    except Exception as e:
-        conn.close()
-        return {"error": f"Failed to parse CSV: {e}", "imported": False}
-
-    # Insert imports record
+    # Insert imports record; rows_expected is filled in once the file has been read
     cur.execute(
         "INSERT INTO imports(import_id, account_name, source, filename, file_hash, rows_expected) VALUES (?,?,?,?,?,?)",
-        (import_id, account_name, "csv", filename, fhash, len(rows)),
+        (import_id, account_name, "csv", filename, fhash, 0),
     )
 
-    # Save attachment
-    saved_path = save_attachment(import_id, filename, file_bytes)
+    # Record attachment
     cur.execute(
         "INSERT INTO attachments(import_id, path, filename, size, mime_type) VALUES (?,?,?,?,?)",
-        (import_id, os.path.relpath(saved_path, DATA_DIR), filename, len(file_bytes), "text/csv"),
+        (import_id, os.path.relpath(saved_path, DATA_DIR), filename, size, "text/csv"),
     )
 
-    # Select parser based on bank
-    if bank == "citi":
-        parser = parse_transaction_citi
-    elif bank == "chase":
-        parser = parse_transaction_chase
-    else:
-        parser = parse_transaction_generic
-
     parsed = 0
     duplicate = 0
     errors = 0
@@ -254,61 +418,108 @@ def import_csv_bytes(
     if auto_categorize and categorizer is None:
         categorizer = build_categorizer_from_env() or CategorizerPipeline(primary=RuleBasedCategorizer())
     use_categorizer = auto_categorize and categorizer is not None
+    # One pool for the whole import, so fallback threads (and their keep-alive
+    # connections) carry over from batch to batch.
+    categorize_pool = ThreadPoolExecutor(max_workers=CATEGORIZE_CONCURRENCY) if use_categorizer else None
+
+    # Rows are streamed from the saved file and written in executemany batches;
+    # Formatted once, exactly as sqlite3's datetime adapter would, so rows skip the per-value adaptation.
+    now = datetime.datetime.utcnow().isoformat(" ")
+    # txn_ids hash the account name, so only this account's rows can collide. Seeding
+    # `seen` with them skips known duplicates before any per-row work; it also catches
+    # repeats within this file. INSERT OR IGNORE remains as the backstop.
+    seen: set[str] = {row[0] for row in cur.execute("SELECT txn_id FROM transactions WHERE account = ?", (account_name,))}
+    to_insert: list[list] = []
+    # (position in to_insert, categorize kwargs) for rows still missing a category;
+    # categorized per batch so fallback calls can run concurrently.
+    to_categorize: list[tuple[int, Dict[str, Any]]] = []
+    rows_expected = 0
+
+    def flush() -> None:
+        nonlocal parsed, duplicate
+        if to_categorize:
+            try:
+                cat_results = categorizer.categorize_many((kwargs for _, kwargs in to_categorize), executor=categorize_pool)
+            except Exception:
+                # Categorizer failures should not stop ingestion
+                cat_results = []
+            for (pos, _), cat_result in zip(to_categorize, cat_results):
+                if cat_result:
+                    row = to_insert[pos]
+                    row[6] = cat_result.category or row[6]
+                    row[5] = cat_result.merchant or row[5]
+                    row[10] = cat_result.confidence
+            to_categorize.clear()
+        if to_insert:
+            cur.executemany(_INSERT_TXN_SQL, to_insert)
+            parsed += cur.rowcount
+            duplicate += len(to_insert) - cur.rowcount
+            to_insert.clear()
 
-    for r in rows:
-        try:
-            result = parser(r)
-            if not result:
-                errors += 1
-                continue
-            
-            date, amount, desc, category = result
-            merchant = (r.get("Merchant") or r.get("merchant") or "").strip()
-            confidence = None
-            is_income = 1 if amount > 0 else 0
-
-            if use_categorizer and (not category or category.strip() == ""):
+    try:
+        with open(saved_path, "rb") as handle:
+            reader = parse_csv_rows(handle)
+            # Select parser based on bank and the file's header
+            parser = make_parser(reader.fieldnames, bank)
+            for r in reader:
+                rows_expected += 1
                 try:
-                    cat_result = categorizer.categorize(description=desc, amount=amount, merchant=merchant or None, mcc=r.get("MCC"))
-                    if cat_result:
-                        category = cat_result.category or category
-                        merchant = cat_result.merchant or merchant
-                        confidence = cat_result.confidence
+                    result = parser(r)
+                    if not result:
+                        errors += 1
+                        continue
+
+                    date, amount, desc, category = result
+                    merchant = (r.get("Merchant") or r.get("merchant") or "").strip()
+                    is_income = 1 if amount > 0 else 0
+
+                    txnid = transaction_hash(date, amount, desc, account_name)
+                    if txnid in seen:
+                        duplicate += 1
+                        continue
+                    raw_json = _row_json(r)
+                    to_insert.append(
+                        [
+                            txnid,
+                            import_id,
+                            date,
+                            amount,
+                            desc,
+                            merchant or None,
+                            category,
+                            account_name,
+                            "USD",
+                            is_income,
+                            None,
+                            raw_json,
+                            now,
+                            now,
+                        ]
+                    )
+                    seen.add(txnid)
+                    if use_categorizer and (not category or category.strip() == ""):
+                        # Indexed only once the row is queued, so a failure above can't misalign positions
+                        to_categorize.append(
+                            (len(to_insert) - 1, {"description": desc, "amount": amount, "merchant": merchant or None, "mcc": r.get("MCC")})
+                        )
                 except Exception:
-                    # Categorizer failures should not stop ingestion
-                    pass
-
-            txnid = transaction_hash(date, amount, desc, account_name)
-            raw_json = json.dumps(r, ensure_ascii=False)
-            try:
-                cur.execute(
-                    "INSERT INTO transactions(txn_id, import_id, date, amount, description, merchant, category, account, currency, is_income, confidence, raw_json, created_at, updated_at) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-                    (
-                        txnid,
-                        import_id,
-                        date,
-                        amount,
-                        desc,
-                        merchant or None,
-                        category,
-                        account_name,
-                        "USD",
-                        is_income,
-                        confidence,
-                        raw_json,
-                        datetime.datetime.utcnow(),
-                        datetime.datetime.utcnow(),
-                    ),
-                )
-                parsed += 1
-            except sqlite3.IntegrityError:
-                duplicate += 1
-        except Exception:
-            errors += 1
+                    errors += 1
+                if len(to_insert) >= IMPORT_BATCH_SIZE:
+                    flush()
+    except (csv.Error, OSError) as e:
+        if categorize_pool is not None:
+            categorize_pool.shutdown()
+        conn.rollback()
+        conn.close()
+        os.remove(saved_path)
+        return {"error": f"Failed to parse CSV: {e}", "imported": False}
+    flush()
+    if categorize_pool is not None:
+        categorize_pool.shutdown()
 
     cur.execute(
-        "UPDATE imports SET rows_parsed = ?, rows_duplicate = ?, rows_error = ?, updated_at = CURRENT_TIMESTAMP WHERE import_id = ?",
-        (parsed, duplicate, errors, import_id),
+        "UPDATE imports SET rows_expected = ?, rows_parsed = ?, rows_duplicate = ?, rows_error = ?, updated_at = CURRENT_TIMESTAMP WHERE import_id = ?",
+        (rows_expected, parsed, duplicate, errors, import_id),
     )
     conn.commit()
     conn.close()
@@ -316,7 +527,7 @@ def import_csv_bytes(
     return {
         "import_id": import_id,
         "filename": filename,
-        "rows_expected": len(rows),
+        "rows_expected": rows_expected,
         "rows_parsed": parsed,
         "rows_duplicate": duplicate,
         "rows_error": errors,
@@ -324,19 +535,32 @@ def import_csv_bytes(
     }
 
 
-def list_transactions(limit: int = 100, offset: int = 0, account: str | None = None) -> list[Dict[str, Any]]:
-    ensure_db()
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+def list_transactions(
+    limit: int = 100,
+    offset: int = 0,
+    account: str | None = None,
+    cursor: tuple[str, str] | None = None,
+) -> list[Dict[str, Any]]:
+    """Newest-first page of transactions.
+
+    Pass `cursor=(date, txn_id)` from the last row of the previous page for keyset
+    pagination, which seeks straight to the page through idx_txn_account_date
+    instead of re-scanning `offset` rows. `offset` still applies on top of it.
+    """
+    cur = get_conn().cursor()
     sql = "SELECT txn_id, date, amount, description, merchant, category, account, currency, reconciled FROM transactions"
-    params = []
+    clauses = []
+    params: list[Any] = []
     if account:
-        sql += " WHERE account = ?"
+        clauses.append("account = ?")
         params.append(account)
-    sql += " ORDER BY date DESC LIMIT ? OFFSET ?"
+    if cursor:
+        clauses.append("(date, txn_id) < (?, ?)")
+        params.extend(cursor)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY date DESC, txn_id DESC LIMIT ? OFFSET ?"
     params.extend([limit, offset])
     cur.execute(sql, tuple(params))
     cols = [c[0] for c in cur.description]
-    rows = [dict(zip(cols, r)) for r in cur.fetchall()]
-    conn.close()
-    return rows
+    return [dict(zip(cols, r)) for r in cur.fetchall()]
@@ -47,6 +47,7 @@ CREATE TABLE IF NOT EXISTS transactions (
 );
 CREATE INDEX IF NOT EXISTS idx_txn_date ON transactions(date);
 CREATE INDEX IF NOT EXISTS idx_txn_account ON transactions(account);
+CREATE INDEX IF NOT EXISTS idx_txn_account_date ON transactions(account, date DESC, txn_id DESC);
 CREATE INDEX IF NOT EXISTS idx_txn_category ON transactions(category);
 CREATE INDEX IF NOT EXISTS idx_txn_import ON transactions(import_id);
 CREATE INDEX IF NOT EXISTS idx_txn_is_income ON transactions(is_income);
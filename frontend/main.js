@@ -1149,6 +1149,40 @@ function updateLineChart(chartRef, canvasId, config, title) {
   return chartRef;
 }
 
+const LAZY_ROW_CHUNK = 100;
+
+// Appends rows to `tbody` one chunk at a time: the first chunk renders right away and
+// the next one only when `scrollEl` is scrolled near its bottom, so long tables paint
+// without building every row up front.
+function renderRowsLazily(scrollEl, tbody, rows, renderRow) {
+  if (scrollEl._lazyRowsListener) {
+    scrollEl.removeEventListener("scroll", scrollEl._lazyRowsListener);
+    scrollEl._lazyRowsListener = null;
+  }
+  let rendered = 0;
+  const renderChunk = () => {
+    const end = Math.min(rendered + LAZY_ROW_CHUNK, rows.length);
+    const fragment = document.createDocumentFragment();
+    for (; rendered < end; rendered += 1) {
+      fragment.appendChild(renderRow(rows[rendered]));
+    }
+    tbody.appendChild(fragment);
+  };
+  renderChunk();
+  if (rendered >= rows.length) return;
+
+  const onScroll = () => {
+    if (scrollEl.scrollTop + scrollEl.clientHeight < scrollEl.scrollHeight - 200) return;
+    renderChunk();
+    if (rendered >= rows.length) {
+      scrollEl.removeEventListener("scroll", onScroll);
+      scrollEl._lazyRowsListener = null;
+    }
+  };
+  scrollEl.addEventListener("scroll", onScroll, { passive: true });
+  scrollEl._lazyRowsListener = onScroll;
+}
+
 function renderAggregateTable(records) {
   const container = document.getElementById("aggregate-table");
   container.innerHTML = "";
@@ -1166,7 +1200,10 @@ function renderAggregateTable(records) {
       <th>Liquid</th>
     </tr>`;
   const tbody = document.createElement("tbody");
-  records.forEach((record) => {
+  table.appendChild(thead);
+  table.appendChild(tbody);
+  container.appendChild(table);
+  renderRowsLazily(container, tbody, records, (record) => {
     const net = normalizeCurrencyValue(record.NetWorth);
     const liquid = normalizeCurrencyValue(record.Liquid);
     const tr = document.createElement("tr");
@@ -1176,11 +1213,8 @@ function renderAggregateTable(records) {
       <td>${currencyFormat.format(net)}</td>
       <td>${currencyFormat.format(liquid)}</td>
     `;
-    tbody.appendChild(tr);
+    return tr;
   });
-  table.appendChild(thead);
-  table.appendChild(tbody);
-  container.appendChild(table);
 }
 
 function renderCharts(payload) {
@@ -1598,15 +1632,15 @@ async function fetchTransactions() {
     const thead = document.createElement('thead');
     thead.innerHTML = '<tr><th>Date</th><th>Description</th><th>Amount</th><th>Account</th><th>Category</th></tr>';
     const tbody = document.createElement('tbody');
-    rows.forEach((r) => {
-      const tr = document.createElement('tr');
-      tr.innerHTML = `<td>${r.date}</td><td>${(r.description||'').slice(0,80)}</td><td>${new Intl.NumberFormat('en-US',{style:'currency',currency:'USD'}).format(r.amount)}</td><td>${r.account||''}</td><td>${r.category||''}</td>`;
-      tbody.appendChild(tr);
-    });
     table.appendChild(thead);
     table.appendChild(tbody);
     transactionsTableEl.innerHTML = '';
     transactionsTableEl.appendChild(table);
+    renderRowsLazily(transactionsTableEl, tbody, rows, (r) => {
+      const tr = document.createElement('tr');
+      tr.innerHTML = `<td>${r.date}</td><td>${(r.description||'').slice(0,80)}</td><td>${currencyFormat.format(r.amount)}</td><td>${r.account||''}</td><td>${r.category||''}</td>`;
+      return tr;
+    });
     // Populate summary controls (derive years from loaded transactions)
     try {
       if (typeof buildSummaryControls === 'function') buildSummaryControls(rows);
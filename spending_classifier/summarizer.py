@@ -5,13 +5,22 @@ Produces a JSON file for the lightweight dashboard in spending_classifier/dashbo
 from __future__ import annotations
 
 import argparse
+import bisect
 import csv
+import hashlib
 import json
 import pathlib
 import re
+from collections import defaultdict
 from difflib import SequenceMatcher
+from functools import lru_cache
 from typing import Dict, Iterable, List
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
 
 DESCRIPTION_FIELDS = (
     "Description",
@@ -45,18 +54,31 @@ DATE_FIELDS = (
 )
 
 
+_WWW_RE = re.compile(r"\bwww\.")
+_DOMAIN_RE = re.compile(r"\b([a-z0-9-]+)\.(com|net|org|co|io|us|edu)\b")
+_DIGIT_WORD_RE = re.compile(r"\b[0-9a-z]*\d+[0-9a-z]*\b")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_ISO_DATE_RE = re.compile(r"^(\d{4})[-/]\d{1,2}[-/]\d{1,2}$")
+_US_DATE_RE = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+
+
+# Statement descriptions repeat heavily, so both helpers are memoized.
+@lru_cache(maxsize=None)
 def normalize_text(text: str) -> str:
     lowered = (text or "").lower()
-    lowered = re.sub(r"\bwww\.", "", lowered)
-    lowered = re.sub(r"\b([a-z0-9-]+)\.(com|net|org|co|io|us|edu)\b", r"\1", lowered)
-    lowered = re.sub(r"\b[0-9a-z]*\d+[0-9a-z]*\b", " ", lowered)
-    cleaned = re.sub(r"[^a-z0-9\s]", " ", lowered)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    lowered = _WWW_RE.sub("", lowered)
+    lowered = _DOMAIN_RE.sub(r"\1", lowered)
+    lowered = _DIGIT_WORD_RE.sub(" ", lowered)
+    cleaned = _NON_ALNUM_RE.sub(" ", lowered)
+    cleaned = _WHITESPACE_RE.sub(" ", cleaned).strip()
     return cleaned
 
 
+@lru_cache(maxsize=None)
 def tokenize(text: str) -> str:
-    tokens = re.findall(r"[a-z0-9]+", (text or "").lower())
+    tokens = _TOKEN_RE.findall((text or "").lower())
     return " ".join(tokens)
 
 
@@ -71,6 +93,16 @@ def similarity(a: str, b: str) -> float:
     return prefix_len / max(len(a), len(b))
 
 
+def jaccard(a: frozenset[int], b: frozenset[int]) -> float:
+    """Token-set Jaccard similarity over interned token IDs."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+SIMILARITY_METRICS = ("prefix", "jaccard")
+
+
 def parse_amount(raw: str) -> float | None:
     if raw is None:
         return None
@@ -87,10 +119,10 @@ def parse_year(raw: str) -> int | None:
     if not raw:
         return None
     value = str(raw).strip()
-    match = re.match(r"^(\d{4})[-/]\d{1,2}[-/]\d{1,2}$", value)
+    match = _ISO_DATE_RE.match(value)
     if match:
         return int(match.group(1))
-    match = re.match(r"^(\d{1,2})/(\d{1,2})/(\d{4})$", value)
+    match = _US_DATE_RE.match(value)
     if match:
         return int(match.group(3))
     return None
@@ -101,25 +133,32 @@ def read_transactions(paths: Iterable[pathlib.Path]) -> List[Dict[str, object]]:
     for path in paths:
         with path.open("r", encoding="utf-8", errors="replace") as handle:
             reader = csv.DictReader(handle)
+            # Every row carries the header's keys, so resolve which candidate
+            # fields this file has once instead of probing each one per row.
+            present = set(reader.fieldnames or ())
+            description_fields = [field for field in DESCRIPTION_FIELDS if field in present]
+            amount_fields = [(field, field.lower()) for field in AMOUNT_FIELDS if field in present]
+            category_fields = [field for field in CATEGORY_FIELDS if field in present]
+            date_fields = [field for field in DATE_FIELDS if field in present]
             for row in reader:
                 value = ""
-                for field in DESCRIPTION_FIELDS:
-                    if field in row and row[field]:
+                for field in description_fields:
+                    if row[field]:
                         value = row[field]
                         break
                 if not value:
                     continue
 
                 amount = None
-                for field in AMOUNT_FIELDS:
-                    if field not in row or not row[field]:
+                for field, kind in amount_fields:
+                    if not row[field]:
                         continue
                     parsed = parse_amount(row[field])
                     if parsed is None:
                         continue
-                    if field.lower() == "debit":
+                    if kind == "debit":
                         amount = -abs(parsed)
-                    elif field.lower() == "credit":
+                    elif kind == "credit":
                         amount = abs(parsed)
                     else:
                         amount = parsed
@@ -128,14 +167,14 @@ def read_transactions(paths: Iterable[pathlib.Path]) -> List[Dict[str, object]]:
                     continue
 
                 category_value = ""
-                for field in CATEGORY_FIELDS:
-                    if field in row and row[field]:
+                for field in category_fields:
+                    if row[field]:
                         category_value = str(row[field]).strip()
                         break
 
                 date_value = ""
-                for field in DATE_FIELDS:
-                    if field in row and row[field]:
+                for field in date_fields:
+                    if row[field]:
                         date_value = str(row[field]).strip()
                         break
                 year_value = parse_year(date_value)
@@ -153,42 +192,79 @@ def read_transactions(paths: Iterable[pathlib.Path]) -> List[Dict[str, object]]:
     return transactions
 
 
-def aggregate_descriptions(transactions: Iterable[Dict[str, object]]) -> Dict[tuple[str, str], Dict[str, float]]:
-    agg: Dict[tuple[str, str], Dict[str, float]] = {}
+def aggregate_descriptions(
+    transactions: Iterable[Dict[str, object]],
+    transactions_by_desc: Dict[tuple[str, str], List[Dict[str, object]]] | None = None,
+) -> Dict[tuple[str, str], Dict[str, float]]:
+    """Per-(description, category) counts and spending.
+
+    When `transactions_by_desc` is given, each transaction is also grouped into it
+    under the same key during this pass.
+    """
+    agg: Dict[tuple[str, str], Dict[str, float]] = defaultdict(lambda: {"count": 0.0, "spending": 0.0, "spending_count": 0.0})
     for item in transactions:
         desc = str(item["description"])
         amount = float(item["amount"])
         category = str(item.get("category") or "").strip()
         key = (desc, category)
-        if key not in agg:
-            agg[key] = {"count": 0.0, "spending": 0.0, "spending_count": 0.0}
-        agg[key]["count"] += 1.0
+        if transactions_by_desc is not None:
+            transactions_by_desc.setdefault(key, []).append(item)
+        stats = agg[key]
+        stats["count"] += 1.0
         if amount < 0:
-            agg[key]["spending"] += abs(amount)
-            agg[key]["spending_count"] += 1.0
-    return agg
+            stats["spending"] += abs(amount)
+            stats["spending_count"] += 1.0
+    return dict(agg)
 
 
 def cluster_descriptions(
     aggregates: Dict[tuple[str, str], Dict[str, float]],
     transactions_by_desc: Dict[tuple[str, str], List[Dict[str, object]]],
     threshold: float,
+    metric: str = "prefix",
 ) -> List[Dict[str, object]]:
+    """Greedily group descriptions around the most frequent unassigned root.
+
+    `metric` is "prefix" (common-prefix ratio of normalized text, see `similarity`)
+    or "jaccard" (token-set overlap of normalized text, see `jaccard`).
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f"Unknown similarity metric: {metric!r}")
     items: List[Tuple[tuple[str, str], Dict[str, float]]] = sorted(
         aggregates.items(),
         key=lambda kv: (-kv[1]["count"], kv[0][0], kv[0][1]),
     )
-    assigned: Dict[str, str] = {}
+    # Normalize every description once.
+    norms = [normalize_text(desc) for (desc, _), _ in items]
+    if metric == "jaccard":
+        # Intern tokens as small ints. With a positive threshold a match must share at
+        # least one token with the root, so candidates come from the token postings.
+        vocab: Dict[str, int] = {}
+        keys = [frozenset(vocab.setdefault(token, len(vocab)) for token in norm.split()) for norm in norms]
+        postings: Dict[int, List[int]] = defaultdict(list)
+        for index, ids in enumerate(keys):
+            for token_id in ids:
+                postings[token_id].append(index)
+        score = jaccard
+    else:
+        # `similarity` is a common-prefix ratio, so a description can only reach
+        # `threshold` against a root if it shares the root's first
+        # int(threshold * len(root_norm)) characters; those candidates form one
+        # contiguous range of the norm-sorted index and are found by bisection.
+        keys = norms
+        by_norm = sorted(range(len(items)), key=norms.__getitem__)
+        sorted_norms = [norms[i] for i in by_norm]
+        score = similarity
+    assigned: List[bool] = [False] * len(items)
     clusters: List[Dict[str, object]] = []
 
-    for (desc, category), stats in items:
-        key = (desc, category)
-        if key in assigned:
+    for index, ((desc, category), stats) in enumerate(items):
+        if assigned[index]:
             continue
 
         root = desc
         root_category = category
-        root_norm = normalize_text(desc)
+        root_norm = norms[index]
         root_tokens = tokenize(desc)
         cluster_items = [
             {
@@ -199,28 +275,44 @@ def cluster_descriptions(
                 "spending_count": int(stats["spending_count"]),
             }
         ]
-        assigned[key] = root
-
-        for (other_desc, other_category), other_stats in items:
-            other_key = (other_desc, other_category)
-            if other_key in assigned:
+        assigned[index] = True
+
+        if metric == "jaccard":
+            if threshold > 0:
+                candidates = {i for token_id in keys[index] for i in postings[token_id]}
+            else:
+                candidates = range(len(items))
+        else:
+            prefix = root_norm[: max(0, min(len(root_norm), int(threshold * len(root_norm))))]
+            lo = bisect.bisect_left(sorted_norms, prefix)
+            hi = bisect.bisect_left(sorted_norms, prefix + "\U0010ffff", lo) if prefix else len(sorted_norms)
+            candidates = by_norm[lo:hi]
+        root_key = keys[index]
+        matches = []
+        for other_index in candidates:
+            if assigned[other_index]:
                 continue
+            other_category = items[other_index][0][1]
             if root_category and other_category and root_category != other_category:
                 continue
-            other_norm = normalize_text(other_desc)
-            if not other_norm:
+            if not norms[other_index]:
                 continue
-            if similarity(root_norm, other_norm) >= threshold:
-                cluster_items.append(
-                    {
-                        "description": other_desc,
-                        "category": other_category,
-                        "count": int(other_stats["count"]),
-                        "total_spending": round(other_stats["spending"], 2),
-                        "spending_count": int(other_stats["spending_count"]),
-                    }
-                )
-                assigned[other_key] = root
+            if score(root_key, keys[other_index]) >= threshold:
+                matches.append(other_index)
+
+        # keep members in `items` order, as the original full scan produced them
+        for other_index in sorted(matches):
+            (other_desc, other_category), other_stats = items[other_index]
+            cluster_items.append(
+                {
+                    "description": other_desc,
+                    "category": other_category,
+                    "count": int(other_stats["count"]),
+                    "total_spending": round(other_stats["spending"], 2),
+                    "spending_count": int(other_stats["spending_count"]),
+                }
+            )
+            assigned[other_index] = True
 
         total_count = sum(item["count"] for item in cluster_items)
         total_spending = round(sum(item["total_spending"] for item in cluster_items), 2)
@@ -248,16 +340,12 @@ def cluster_descriptions(
     return clusters
 
 
-def build_summary(paths: Iterable[pathlib.Path], threshold: float) -> Dict[str, object]:
+def build_summary(paths: Iterable[pathlib.Path], threshold: float, metric: str = "prefix") -> Dict[str, object]:
     path_list = list(paths)
     transactions = read_transactions(path_list)
-    aggregates = aggregate_descriptions(transactions)
     transactions_by_desc: Dict[tuple[str, str], List[Dict[str, object]]] = {}
-    for txn in transactions:
-        desc = str(txn["description"])
-        category = str(txn.get("category") or "").strip()
-        transactions_by_desc.setdefault((desc, category), []).append(txn)
-    clusters = cluster_descriptions(aggregates, transactions_by_desc, threshold)
+    aggregates = aggregate_descriptions(transactions, transactions_by_desc)
+    clusters = cluster_descriptions(aggregates, transactions_by_desc, threshold, metric)
     mapping: Dict[str, List[str]] = {}
     for cluster in clusters:
         root = cluster["root_label"]
@@ -269,12 +357,64 @@ def build_summary(paths: Iterable[pathlib.Path], threshold: float) -> Dict[str,
             "total_transactions": len(transactions),
             "unique_descriptions": len(aggregates),
             "similarity_threshold": threshold,
+            "similarity_metric": metric,
         },
         "mapping": mapping,
         "clusters": clusters,
     }
 
 
+def _json_bytes(obj: object, indent: bool = False) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def _json_load(path: pathlib.Path) -> object:
+    data = path.read_bytes()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN tokens written by stdlib json
+    return json.loads(data)
+
+
+# Bump when build_summary's output changes so stale cache entries stop matching.
+SUMMARY_CACHE_VERSION = 2
+
+
+def summary_cache_key(paths: Iterable[pathlib.Path], threshold: float, metric: str = "prefix") -> str:
+    """Key for a summary built from `paths` as they are on disk now (name, mtime, size)."""
+    fingerprint = [SUMMARY_CACHE_VERSION, threshold, metric]
+    for path in paths:
+        stat = path.stat()
+        fingerprint.append((path.name, stat.st_mtime_ns, stat.st_size))
+    return hashlib.blake2b(repr(fingerprint).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def build_summary_cached(
+    paths: Iterable[pathlib.Path], threshold: float, cache_dir: pathlib.Path, metric: str = "prefix"
+) -> Dict[str, object]:
+    """`build_summary`, reusing the JSON stored under `cache_dir` when the statements are unchanged."""
+    path_list = list(paths)
+    cache_path = cache_dir / f"{summary_cache_key(path_list, threshold, metric)}.json"
+    try:
+        return _json_load(cache_path)
+    except (OSError, ValueError):
+        pass
+
+    summary = build_summary(path_list, threshold, metric)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_bytes(_json_bytes(summary))
+    tmp_path.replace(cache_path)
+    return summary
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Summarize and cluster transaction descriptions.")
     parser.add_argument(
@@ -288,21 +428,34 @@ def main() -> int:
         default=0.75,
         help="Similarity threshold (0-1) for grouping descriptions.",
     )
+    parser.add_argument(
+        "--metric",
+        choices=SIMILARITY_METRICS,
+        default="prefix",
+        help="Similarity used for grouping: common-prefix ratio or token-set Jaccard.",
+    )
     parser.add_argument(
         "--out",
         default=str(pathlib.Path(__file__).resolve().parent / "dashboard" / "data.json"),
         help="Output JSON path for the dashboard.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rebuild the summary even if the statements are unchanged since the last run.",
+    )
     args = parser.parse_args()
 
     statements_dir = pathlib.Path(args.statements_dir)
     paths = sorted(statements_dir.glob("*.CSV"))
-    summary = build_summary(paths, args.threshold)
-
     out_path = pathlib.Path(args.out)
+    if args.no_cache:
+        summary = build_summary(paths, args.threshold, args.metric)
+    else:
+        summary = build_summary_cached(paths, args.threshold, out_path.parent / ".summary_cache", args.metric)
+
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with out_path.open("w", encoding="utf-8") as handle:
-        json.dump(summary, handle, indent=2)
+    out_path.write_bytes(_json_bytes(summary, indent=True))
 
     print(f"Wrote summary to {out_path}")
     return 0
@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from backend.engine.aggregate import aggregate_period
+
+
+def _monthly_frame():
+    rows = []
+    for scenario in ("B", "A"):
+        for month in range(6):
+            rows.append(
+                {
+                    "Scenario": scenario,
+                    "MonthIndex": month,
+                    "CalendarYear": 2024,
+                    "MonthInYear": month + 1,
+                    "NetWorth": float(month),
+                }
+            )
+    # Deliberately out of (Scenario, MonthIndex) order.
+    return pd.DataFrame(rows[::-1])
+
+
+@pytest.mark.parametrize("freq", ["M", "Q", "Y"])
+def test_aggregate_period_leaves_input_untouched(freq):
+    df = _monthly_frame()
+    before = df.copy()
+
+    aggregate_period(df, freq)
+
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_quarterly_keeps_last_month_per_scenario():
+    out = aggregate_period(_monthly_frame(), "Q")
+
+    assert out["Scenario"].tolist() == ["A", "A", "B", "B"]
+    assert out["Period"].tolist() == ["2024 Q1", "2024 Q2"] * 2
+    assert out["NetWorth"].tolist() == [2.0, 5.0, 2.0, 5.0]
@@ -0,0 +1,62 @@
+import pytest
+
+from backend import backend
+from backend.backend import app, parse_accounts, parse_cashflows
+
+
+def test_parse_accounts_skips_blank_rows_and_converts_months():
+    rows = [
+        {"Name": "", "Amount (USD)": 100},
+        {"Name": "Zero", "Amount (USD)": 0},
+        {
+            "Name": " Brokerage ",
+            "Category": "Investment",
+            "Amount (USD)": "2500",
+            "APR (%)": 6,
+            "Start Month": "2025-04",
+            "End Month": "2020-01",
+            "Action at End": "liquidate_to_cash",
+        },
+        {"Name": "Legacy", "Principal": 50, "Start Month": "not-a-month"},
+    ]
+
+    accounts = parse_accounts(rows, 2024)
+
+    assert [a.name for a in accounts] == ["Brokerage", "Legacy"]
+    brokerage, legacy = accounts
+    assert brokerage.category == "investment"
+    assert brokerage.principal == 2500.0
+    assert brokerage.apr == pytest.approx(0.06)
+    assert brokerage.start_year == pytest.approx(1.25)
+    assert brokerage.end_year == 0.0  # months before the plan start clamp to zero
+    assert brokerage.end_action == "liquidate_to_cash"
+    assert legacy.principal == 50.0
+    assert legacy.start_year == 0.0
+
+
+def test_parse_cashflows_flags_taxable_income_only():
+    rows = [
+        {"Name": "Pay", "Category": " Salary ", "Annual Amount": 1200, "End Month": "2026-07"},
+        {"Name": "Gift", "Category": "other", "Annual Amount": 300},
+    ]
+
+    incomes = parse_cashflows(rows, 2024, "income")
+    spendings = parse_cashflows(rows, 2024, "spending")
+
+    assert [f.taxable for f in incomes] == [True, False]
+    assert [f.taxable for f in spendings] == [False, False]
+    assert incomes[0].end_year == pytest.approx(2.5)
+    assert incomes[1].category == "other"
+
+
+def test_scenarios_cache_only_keeps_supported_freqs():
+    client = app.test_client()
+
+    for freq in ("q", "Y", "bogus", "W"):
+        resp = client.get(f"/api/scenarios?freq={freq}")
+        assert resp.status_code == 200
+        assert resp.get_json()["freq"] == freq.upper()
+
+    version, bodies = backend._aggregate_cache
+    assert version == backend.state.version
+    assert set(bodies) == {"Q", "Y"}
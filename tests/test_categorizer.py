@@ -1,3 +1,8 @@
+import time
+
+import pytest
+
+from backend.statements import categorizer as categorizer_module
 from backend.statements.categorizer import (
     CategorizationResult,
     CategorizerPipeline,
@@ -16,6 +21,13 @@ def test_rule_based_matches_groceries_keyword():
     assert result.confidence > 0.0
 
 
+def test_rule_based_accepts_missing_amount():
+    categorizer = RuleBasedCategorizer(merchant_map={"shell": "transport"})
+
+    assert categorizer.categorize(description="Fuel", amount=None, merchant="Shell").category == "transport"
+    assert categorizer.categorize(description="Walmart Supercenter", amount=None).category == "groceries"
+
+
 def test_pipeline_uses_fallback_when_rules_low_confidence():
     def fake_fallback(description: str, amount: float, merchant=None, mcc=None):
         return CategorizationResult(category="travel", confidence=0.9, source="dummy-fallback")
@@ -29,3 +41,77 @@ def test_pipeline_uses_fallback_when_rules_low_confidence():
     assert result is not None
     assert result.category == "travel"
     assert result.source == "dummy-fallback"
+
+
+def _with_and_without_automaton(monkeypatch, **kwargs):
+    fast = RuleBasedCategorizer(**kwargs)
+    monkeypatch.setattr(categorizer_module, "ahocorasick", None)
+    plain = RuleBasedCategorizer(**kwargs)
+    return fast, plain
+
+
+OVERLAP_KEYWORDS = {
+    "dining": ("coffee", "cafe"),
+    "groceries": ("coffee beans", "beans", "market"),
+    "shopping": ("market place", "place"),
+}
+KEYWORD_CASES = [
+    ("Coffee beans at the cafe", -5.0),  # 2 dining vs 2 groceries: first category in map order wins
+    ("bulk coffee beans", -5.0),  # groceries scores 2, dining 1
+    ("coffee coffee coffee", -5.0),  # repeats count once
+    ("market place", -5.0),  # groceries 1 vs shopping 2
+    ("beans beans market", 10.0),
+    ("no keywords here", -1.0),
+]
+
+
+@pytest.mark.skipif(categorizer_module.ahocorasick is None, reason="pyahocorasick not installed")
+def test_keyword_automaton_matches_plain_loop(monkeypatch):
+    fast, plain = _with_and_without_automaton(monkeypatch, keyword_map=OVERLAP_KEYWORDS, min_confidence=0.1)
+    assert fast._automaton is not None and plain._automaton is None
+
+    for description, amount in KEYWORD_CASES:
+        assert fast.categorize(description, amount) == plain.categorize(description, amount)
+
+    assert fast.categorize("Coffee beans at the cafe", -5.0).category == "dining"
+    assert fast.categorize("bulk coffee beans", -5.0).category == "groceries"
+    assert fast.categorize("market place", -5.0).category == "shopping"
+
+
+OVERLAP_MERCHANTS = {"shell": "transport", "shell gas": "utilities", "gas": "housing"}
+MERCHANT_CASES = [
+    "Shell Gas Station",  # several keys match; the first in map order wins
+    "gas n go",
+    "shell gas",  # exact merchant key
+    "unknown merchant",
+]
+
+
+@pytest.mark.skipif(categorizer_module.ahocorasick is None, reason="pyahocorasick not installed")
+def test_merchant_automaton_matches_plain_scan(monkeypatch):
+    fast, plain = _with_and_without_automaton(monkeypatch, merchant_map=OVERLAP_MERCHANTS)
+    assert fast._merchant_automaton is not None and plain._merchant_automaton is None
+
+    for merchant in MERCHANT_CASES:
+        assert fast.categorize("anything", -40.0, merchant=merchant) == plain.categorize("anything", -40.0, merchant=merchant)
+
+    assert fast.categorize("anything", -40.0, merchant="Shell Gas Station").category == "transport"
+    assert fast.categorize("anything", -40.0, merchant="shell gas").category == "utilities"
+
+
+def test_categorize_many_keeps_input_order():
+    def slow_fallback(description: str, amount: float, merchant=None, mcc=None):
+        # Later rows finish first, so results arrive out of order.
+        time.sleep(0.001 * (10 - int(description.split()[-1])))
+        return CategorizationResult(category=f"fb-{description}", confidence=0.9, source="dummy-fallback")
+
+    pipeline = CategorizerPipeline(primary=RuleBasedCategorizer(), fallback=slow_fallback)
+    rows = [{"description": f"mystery {i}", "amount": -1.0} for i in range(10)]
+    rows[3] = {"description": "Walmart Supercenter", "amount": -54.12}
+
+    results = pipeline.categorize_many(rows, max_concurrency=4)
+
+    assert [r.category for r in results] == [
+        "groceries" if i == 3 else f"fb-mystery {i}" for i in range(10)
+    ]
+    assert results == [pipeline.categorize(**row) for row in rows]
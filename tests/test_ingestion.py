@@ -0,0 +1,265 @@
+import io
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from backend.statements import ingestion
+from backend.statements.categorizer import CategorizationResult, CategorizerPipeline, RuleBasedCategorizer
+from backend.statements.ingestion import make_parser, parse_csv_rows, parse_transaction_generic
+
+
+def _reference_generic(row):
+    """The generic parser as it was before it was specialized per header."""
+    date = (row.get("Date") or row.get("date") or row.get("Transaction Date") or "").strip()
+    desc = (row.get("Description") or row.get("description") or row.get("Transaction Description") or "").strip()
+    category = (row.get("Category") or row.get("category") or "").strip()
+    if not date or not desc:
+        return None
+    amount = 0.0
+    amount_raw = (row.get("Amount") or row.get("amount") or row.get("Debit/Credit") or row.get("Value") or "").strip()
+    if amount_raw:
+        try:
+            amount = float(amount_raw.replace("$", "").replace(",", "").replace("\u2009", ""))
+        except (ValueError, AttributeError):
+            return None
+    else:
+        debit = (row.get("Debit") or "").strip()
+        credit = (row.get("Credit") or "").strip()
+        if debit and debit.upper() != "DEBIT":
+            try:
+                amount = float(debit.replace("$", "").replace(",", "").replace("\u2009", ""))
+            except (ValueError, AttributeError):
+                pass
+        elif credit and credit.upper() != "CREDIT":
+            try:
+                amount = -float(credit.replace("$", "").replace(",", "").replace("\u2009", ""))
+            except (ValueError, AttributeError):
+                pass
+        else:
+            return None
+    return (date, amount, desc, category)
+
+
+BANK_FIXTURES = {
+    "chase": (
+        "Transaction Date,Post Date,Description,Category,Type,Amount\n"
+        "01/02/2024,01/03/2024,WHOLE FOODS,Groceries,Sale,-54.20\n"
+        "01/05/2024,01/06/2024,PAYMENT THANK YOU,,Payment,\"1,200.00\"\n"
+        "01/07/2024,01/08/2024,,Shopping,Sale,-3.00\n"
+        "01/09/2024,01/10/2024,BAD AMOUNT,Shopping,Sale,n/a\n"
+    ),
+    "citi": (
+        "Status,Date,Description,Debit,Credit,Member Name\n"
+        "Cleared,2024-02-01,NETFLIX,15.49,,A\n"
+        "Cleared,2024-02-03,REFUND,,-20.00,A\n"
+        "Cleared,2024-02-04,HEADER ECHO,Debit,Credit,A\n"
+        "Cleared,2024-02-05,NOTHING,,,A\n"
+        "Cleared,2024-02-06,JUNK DEBIT,$x,,A\n"
+    ),
+    "lowercase": (
+        "date,description,category,amount\n"
+        "2024-03-01,coffee,Dining, $4.50 \n"
+        " ,blank date,Dining,1\n"
+        "2024-03-02,  ,Dining,1\n"
+    ),
+    "mixed": (
+        "Date,date,Transaction Description,Debit/Credit,Value,Category\n"
+        ",2024-04-01,FALLBACK DATE,,12.5,\n"
+        "2024-04-02,,PRIMARY DATE,-7,99,Travel\n"
+        " ,2024-04-03,SPACE IS TRUTHY,1,,\n"
+        "2024-04-04,,EXTRA CELLS,3,,,overflow,more\n"
+    ),
+    "no_amount": (
+        "Description,Date\n"
+        "ORPHAN,2024-05-01\n"
+    ),
+}
+
+
+@pytest.mark.parametrize("bank", sorted(BANK_FIXTURES))
+def test_specialized_generic_parser_matches_reference(bank):
+    reader = parse_csv_rows(io.BytesIO(BANK_FIXTURES[bank].encode("utf-8")))
+    parser = make_parser(reader.fieldnames)
+    rows = list(reader)
+
+    expected = [_reference_generic(row) for row in rows]
+    assert [parser(row) for row in rows] == expected
+    assert [parse_transaction_generic(row) for row in rows] == expected
+    assert any(result is not None for result in expected) or bank == "no_amount"
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    data_dir = tmp_path / "user_data"
+    statements_dir = data_dir / "statements"
+    monkeypatch.setattr(ingestion, "DATA_DIR", str(data_dir))
+    monkeypatch.setattr(ingestion, "LEDGER_DIR", str(data_dir / "ledger"))
+    monkeypatch.setattr(ingestion, "STATEMENTS_DIR", str(statements_dir))
+    monkeypatch.setattr(ingestion, "ATTACHMENTS_DIR", str(statements_dir / "attachments"))
+    monkeypatch.setattr(ingestion, "DB_PATH", str(data_dir / "ledger" / "transactions.sqlite"))
+    ingestion.ensure_db()
+    conn = sqlite3.connect(ingestion.DB_PATH)
+    yield conn
+    conn.close()
+
+
+def _count(conn, table):
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+GENERIC_CSV = (
+    b"Date,Description,Amount\n"
+    b"2024-01-01,Coffee,-4.50\n"
+    b"2024-01-02,Salary,2000\n"
+    b"2024-01-01,Coffee,-4.50\n"
+    b"not-a-row\n"
+)
+
+
+def test_import_counts_in_file_duplicates_and_errors(ledger):
+    result = ingestion.import_csv_bytes(GENERIC_CSV, "jan.csv", "Checking")
+
+    assert result["rows_expected"] == 4
+    assert result["rows_parsed"] == 2
+    assert result["rows_duplicate"] == 1
+    assert result["rows_error"] == 1
+    assert _count(ledger, "transactions") == 2
+    row = ledger.execute(
+        "SELECT rows_expected, rows_parsed, rows_duplicate, rows_error FROM imports WHERE import_id = ?",
+        (result["import_id"],),
+    ).fetchone()
+    assert row == (4, 2, 1, 1)
+
+
+def test_reimport_is_rejected_unless_forced(ledger):
+    first = ingestion.import_csv_bytes(GENERIC_CSV, "jan.csv", "Checking")
+
+    again = ingestion.import_csv_bytes(GENERIC_CSV, "jan.csv", "Checking")
+    assert again == {"error": "File already imported", "imported": False}
+    assert _count(ledger, "imports") == 1
+    assert os.listdir(ingestion.ATTACHMENTS_DIR) == [os.path.basename(first["saved_path"])]
+
+    forced = ingestion.import_csv_bytes(GENERIC_CSV, "jan.csv", "Checking", force=True)
+    assert forced["rows_parsed"] == 0
+    assert forced["rows_duplicate"] == 3
+    assert forced["rows_error"] == 1
+    assert _count(ledger, "imports") == 2
+    assert _count(ledger, "transactions") == 2
+
+    # txn_ids include the account, so the same rows on another account are new.
+    other = ingestion.import_csv_bytes(GENERIC_CSV, "jan.csv", "Savings", force=True)
+    assert other["rows_parsed"] == 2
+
+
+def test_import_records_attachment(ledger):
+    result = ingestion.import_csv_bytes(GENERIC_CSV, "a/b.csv", "Checking")
+
+    path, filename, size, mime_type = ledger.execute(
+        "SELECT path, filename, size, mime_type FROM attachments WHERE import_id = ?", (result["import_id"],)
+    ).fetchone()
+    assert (filename, size, mime_type) == ("a/b.csv", len(GENERIC_CSV), "text/csv")
+    assert path == os.path.join("statements", "attachments", f"{result['import_id']}__a_b.csv")
+    with open(os.path.join(ingestion.DATA_DIR, path), "rb") as handle:
+        assert handle.read() == GENERIC_CSV
+
+
+def test_malformed_csv_rolls_back(ledger):
+    oversized = b"Date,Description,Amount\n2024-01-01,Coffee,-4.50\n2024-01-02," + b"x" * 200_000 + b",1\n"
+
+    result = ingestion.import_csv_bytes(oversized, "bad.csv", "Checking")
+
+    assert result["imported"] is False
+    assert result["error"].startswith("Failed to parse CSV")
+    assert _count(ledger, "imports") == 0
+    assert _count(ledger, "attachments") == 0
+    assert _count(ledger, "transactions") == 0
+    assert os.listdir(ingestion.ATTACHMENTS_DIR) == []
+
+
+def test_empty_csv_imports_nothing(ledger):
+    result = ingestion.import_csv_bytes(b"", "empty.csv", "Checking")
+
+    assert (result["rows_expected"], result["rows_parsed"], result["rows_duplicate"], result["rows_error"]) == (0, 0, 0, 0)
+    assert _count(ledger, "transactions") == 0
+    assert ingestion.import_csv_bytes(b"", "empty.csv", "Checking")["imported"] is False
+
+
+def test_auto_categorize_stays_aligned_when_a_row_fails(ledger, monkeypatch):
+    def fallback(description, amount, merchant=None, mcc=None):
+        return CategorizationResult(category=f"cat-{description}", confidence=0.9, source="test")
+
+    row_json = ingestion._row_json
+
+    def failing_row_json(row):
+        if row["Description"] == "Broken":
+            raise ValueError("cannot serialize")
+        return row_json(row)
+
+    monkeypatch.setattr(ingestion, "_row_json", failing_row_json)
+    pipeline = CategorizerPipeline(primary=RuleBasedCategorizer(min_confidence=1.1), fallback=fallback)
+    data = (
+        b"Date,Description,Amount,Category\n"
+        b"2024-01-01,Alpha,-1,\n"
+        b"2024-01-02,Broken,-2,\n"
+        b"2024-01-03,Gamma,-3,kept\n"
+        b"2024-01-04,Delta,-4,\n"
+    )
+
+    result = ingestion.import_csv_bytes(data, "cat.csv", "Checking", auto_categorize=True, categorizer=pipeline)
+
+    assert result["rows_error"] == 1
+    rows = ledger.execute("SELECT description, category FROM transactions ORDER BY date").fetchall()
+    assert rows == [("Alpha", "cat-Alpha"), ("Gamma", "kept"), ("Delta", "cat-Delta")]
+
+
+def test_auto_categorize_reuses_fallback_threads_across_batches(ledger, monkeypatch):
+    thread_names = set()
+
+    def fallback(description, amount, merchant=None, mcc=None):
+        thread_names.add(threading.current_thread().name)
+        return CategorizationResult(category="misc", confidence=0.9, source="test")
+
+    monkeypatch.setattr(ingestion, "IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(ingestion, "CATEGORIZE_CONCURRENCY", 1)
+    pipeline = CategorizerPipeline(primary=RuleBasedCategorizer(min_confidence=1.1), fallback=fallback)
+    data = b"Date,Description,Amount\n" + b"".join(b"2024-01-01,Item %d,-%d\n" % (i, i + 1) for i in range(7))
+
+    result = ingestion.import_csv_bytes(data, "many.csv", "Checking", auto_categorize=True, categorizer=pipeline)
+
+    assert result["rows_parsed"] == 7
+    assert len(thread_names) == 1
+    assert ledger.execute("SELECT COUNT(*) FROM transactions WHERE category = 'misc'").fetchone()[0] == 7
+
+
+@pytest.mark.parametrize("account", [None, "Checking"])
+def test_cursor_pages_match_offset_pages(ledger, account):
+    # Many rows per date, so page boundaries fall inside runs of equal dates.
+    lines = [b"Date,Description,Amount"]
+    lines += [b"2024-01-%02d,Item %d,-%d" % (1 + i % 4, i, i + 1) for i in range(23)]
+    data = b"\n".join(lines) + b"\n"
+    ingestion.import_csv_bytes(data, "a.csv", "Checking")
+    ingestion.import_csv_bytes(data, "b.csv", "Savings", force=True)
+
+    page_size = 5
+    offset_pages = []
+    offset = 0
+    while True:
+        page = ingestion.list_transactions(limit=page_size, offset=offset, account=account)
+        if not page:
+            break
+        offset_pages.append(page)
+        offset += page_size
+
+    cursor_pages = []
+    cursor = None
+    while True:
+        page = ingestion.list_transactions(limit=page_size, account=account, cursor=cursor)
+        if not page:
+            break
+        cursor_pages.append(page)
+        cursor = (page[-1]["date"], page[-1]["txn_id"])
+
+    assert cursor_pages == offset_pages
+    assert sum(map(len, cursor_pages)) == (23 if account else 46)
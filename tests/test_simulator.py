@@ -0,0 +1,48 @@
+import pytest
+
+from backend.data_model import AccountItem, CashflowItem, PlanConfig
+from backend.engine.simulator import simulate_monthly
+
+
+def _plan(**overrides):
+    cfg = dict(
+        name="Test",
+        start_year=2024,
+        years=1,
+        accounts=[
+            AccountItem(name="Cash", category="cash", principal=1200.0),
+            AccountItem(
+                name="Fund",
+                category="investment",
+                principal=1000.0,
+                apr=0.12,
+                end_year=5 / 12,
+                end_action="liquidate_to_cash",
+            ),
+        ],
+        incomes=[CashflowItem(name="Pay", annual_amount=1200.0, category="other")],
+    )
+    cfg.update(overrides)
+    return PlanConfig(**cfg)
+
+
+def test_liquidated_account_moves_into_cash():
+    df = simulate_monthly(_plan())
+
+    assert len(df) == 12
+    assert df.loc[5, "Fund"] == 0.0
+    assert df.loc[4, "Fund"] == pytest.approx(1000.0 * 1.01**5)
+    assert df["Cash"].iloc[-1] == pytest.approx(1200.0 + 100.0 * 12 + 1000.0 * 1.01**6)
+    assert df["NetWorth"].tolist() == pytest.approx((df["Cash"] + df["Fund"]).tolist())
+
+
+def test_dropped_account_and_virtual_cash_reserve():
+    accounts = [
+        AccountItem(name="Car", category="asset", principal=5000.0, end_year=2 / 12, end_action="drop"),
+    ]
+    df = simulate_monthly(_plan(accounts=accounts))
+
+    assert df["Car"].tolist()[:3] == [5000.0, 5000.0, 0.0]
+    # Income lands in a zero-principal "Cash Reserve" when the plan has no cash account.
+    assert df["Cash Reserve"].iloc[-1] == pytest.approx(1200.0)
+    assert df["Liquid"].iloc[-1] == pytest.approx(1200.0)
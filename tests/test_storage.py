@@ -1,8 +1,10 @@
 import json
 import math
 
-from backend.backend import _sanitize_records
-from backend.engine.storage import _sanitize_json_compat, save_plans
+import pandas as pd
+
+from backend.backend import _frame_records
+from backend.engine.storage import _sanitize_json_compat, load_scenarios, save_plans, save_scenarios
 
 
 def test_sanitize_json_compat_replaces_special_numbers():
@@ -33,9 +35,22 @@ def test_save_plans_persists_sanitized_values(tmp_path):
     assert stored == {"Plan": {"value": None, "items": [1, None]}}
 
 
-def test_sanitize_records_used_for_api_payloads():
-    rows = [{"value": float("nan"), "other": 5}]
+def test_frame_records_used_for_api_payloads():
+    df = pd.DataFrame([{"value": float("nan"), "other": 5}, {"value": float("inf"), "other": 6}])
+
+    clean = _frame_records(df)
+
+    assert clean == [{"value": None, "other": 5}, {"value": None, "other": 6}]
+
+
+def test_scenarios_round_trip_and_legacy_records(tmp_path):
+    path = tmp_path / "scenarios.json"
+    df = pd.DataFrame({"Scenario": ["A", "A"], "MonthIndex": [0, 1], "Cash": [1.5, 2.5]})
+
+    save_scenarios(str(path), {"A": df})
+
+    pd.testing.assert_frame_equal(load_scenarios(str(path))["A"], df)
 
-    clean = _sanitize_records(rows)
+    path.write_text(json.dumps({"A": df.to_dict(orient="records")}), encoding="utf-8")
 
-    assert clean == [{"value": None, "other": 5}]
+    pd.testing.assert_frame_equal(load_scenarios(str(path))["A"], df)